@@ -0,0 +1,118 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import bpy
+import numpy as np
+
+# The value of 'LINEAR' in the keyframe interpolation enum, as foreach_set takes it
+linear_interpolation = 1
+
+# Stored on the shape key datablock so a chained Transform can find where the last one ended without scanning
+last_keyframe_property = 'node_form_last_keyframe'
+
+def shape_key_data_path(key_name):
+    return 'key_blocks["' + bpy.utils.escape_identifier(key_name) + '"].value'
+
+def get_indexed_last_keyframe(shape_keys):
+    return shape_keys.get(last_keyframe_property)
+
+def set_indexed_last_keyframe(shape_keys, frame):
+    shape_keys[last_keyframe_property] = float(frame)
+
+def scan_last_keyframe(action):
+    last_frame = None
+    for fcu in action.fcurves:
+        if len(fcu.keyframe_points) > 0:
+            frames = np.empty(len(fcu.keyframe_points) * 2, dtype=np.float32)
+            fcu.keyframe_points.foreach_get('co', frames)
+            frame = float(frames[0::2].max())
+            if last_frame is None or frame > last_frame:
+                last_frame = frame
+    return last_frame
+
+def get_last_keyframe(shape_keys):
+    # Falls back to a single scan for shape keys animated before the index existed, then remembers it
+    last_frame = get_indexed_last_keyframe(shape_keys)
+    if last_frame is None and shape_keys.animation_data and shape_keys.animation_data.action:
+        last_frame = scan_last_keyframe(shape_keys.animation_data.action)
+        if last_frame is not None:
+            set_indexed_last_keyframe(shape_keys, last_frame)
+    return last_frame
+
+class ShapeKeyAnimationWriter:
+
+    # Collects the value keyframes of every shape key during a bake and writes each F-curve in one go,
+    # instead of one keyframe_insert call (and animation update) per keyframe. With is_linear every keyframe of
+    # the F-curves it writes interpolates linearly instead of easing.
+    def __init__(self, shape_keys, is_linear=False):
+        self.shape_keys = shape_keys
+        self.is_linear = is_linear
+        self.channels = {}
+        self.written = 0
+
+    def insert(self, key_block, frame, value):
+        # Inserting twice on the same frame keeps the last value, like keyframe_insert does
+        self.channels.setdefault(key_block.name, {})[float(frame)] = float(value)
+        key_block.value = value
+
+    def get_action(self):
+        animation_data = self.shape_keys.animation_data or self.shape_keys.animation_data_create()
+        if animation_data.action is None:
+            animation_data.action = bpy.data.actions.new(self.shape_keys.name + 'Action')
+        return animation_data.action
+
+    def flush(self):
+
+        if not self.channels:
+            return
+
+        action = self.get_action()
+        last_frame = get_last_keyframe(self.shape_keys)
+
+        for key_name, points in self.channels.items():
+
+            self.written += len(points)
+            data_path = shape_key_data_path(key_name)
+            fcurve = action.fcurves.find(data_path)
+
+            if fcurve is None:
+                fcurve = action.fcurves.new(data_path)
+            elif len(fcurve.keyframe_points) > 0:
+                # Merge with the keyframes of a previous run, the new ones win on the same frame
+                existing = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+                fcurve.keyframe_points.foreach_get('co', existing)
+                merged = dict(zip(existing[0::2].tolist(), existing[1::2].tolist()))
+                merged.update(points)
+                points = merged
+
+            frames = sorted(points)
+            co = np.empty(len(frames) * 2, dtype=np.float32)
+            co[0::2] = frames
+            co[1::2] = [points[frame] for frame in frames]
+
+            fcurve.keyframe_points.add(len(frames) - len(fcurve.keyframe_points))
+            fcurve.keyframe_points.foreach_set('co', co)
+            if self.is_linear:
+                fcurve.keyframe_points.foreach_set('interpolation', np.full(len(frames), linear_interpolation, dtype=np.int32))
+            fcurve.update()
+
+            if last_frame is None or frames[-1] > last_frame:
+                last_frame = frames[-1]
+
+        set_indexed_last_keyframe(self.shape_keys, last_frame)
+        self.channels.clear()
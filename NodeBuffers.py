@@ -0,0 +1,73 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import numpy as np
+
+# Named flat arrays that only grow, so reading the next frame or object does not allocate.
+# A named buffer is only valid until the next request for the same name.
+buffer_pool = {}
+
+def get_buffer(name, length, dtype=np.float32):
+    buffer = buffer_pool.get(name)
+    if buffer is None or buffer.dtype != dtype or len(buffer) < length:
+        buffer = np.empty(length, dtype=dtype)
+        buffer_pool[name] = buffer
+    return buffer[:length]
+
+def get_coordinate_buffer(name, count, dtype=np.float32):
+    return get_buffer(name, count * 3, dtype).reshape(-1, 3)
+
+def clear_buffers():
+    buffer_pool.clear()
+
+def read_coordinates(collection, name):
+    # Works for mesh.vertices and key_block.data, both expose a 'co' vector per element
+    coordinates = get_coordinate_buffer(name, len(collection))
+    collection.foreach_get('co', coordinates.ravel())
+    return coordinates
+
+def write_coordinates(collection, coordinates):
+    if coordinates.dtype != np.float32:
+        coordinates = coordinates.astype(np.float32)
+    collection.foreach_set('co', np.ascontiguousarray(coordinates).ravel())
+
+def read_shape_key(key_block, name='shape_key'):
+    return read_coordinates(key_block.data, name)
+
+def write_shape_key(key_block, coordinates):
+    write_coordinates(key_block.data, coordinates)
+
+def read_shape_key_float64(key_block, name='shape_key'):
+    # foreach_get is only fast for float32, so the float64 copy is made into a second pooled buffer
+    coordinates = read_shape_key(key_block, name)
+    wide = get_coordinate_buffer(name + '_float64', len(coordinates), np.float64)
+    np.copyto(wide, coordinates)
+    return wide
+
+def fill_mesh(mesh, vertices, edges, faces):
+    # Fills an empty mesh in one pass, faces is an (F, n) array of vertex indices
+    mesh.vertices.add(len(vertices))
+    mesh.edges.add(len(edges))
+    mesh.loops.add(faces.size)
+    mesh.polygons.add(len(faces))
+    write_coordinates(mesh.vertices, vertices)
+    mesh.edges.foreach_set('vertices', np.ascontiguousarray(edges, dtype=np.int32).ravel())
+    mesh.loops.foreach_set('vertex_index', np.ascontiguousarray(faces, dtype=np.int32).ravel())
+    if len(faces) > 0:
+        mesh.polygons.foreach_set('loop_start', np.arange(0, faces.size, faces.shape[1], dtype=np.int32))
+    mesh.update()
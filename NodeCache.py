@@ -0,0 +1,84 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import os
+import struct
+import numpy as np
+
+cache_extensions = {'PC2': '.pc2', 'NPY': '.npy'}
+
+# PC2: signature, file version, point count, start frame, sample rate, sample count
+pc2_header = struct.Struct('<12siiffi')
+
+class PC2Writer:
+
+    # Streams frames into a PC2 point cache, the format read by Blender's Mesh Cache modifier
+    def __init__(self, filepath, vertex_count, frame_count, start_frame=0.0, sample_rate=1.0):
+        self.vertex_count = vertex_count
+        self.file = open(filepath, 'wb')
+        self.file.write(pc2_header.pack(b'POINTCACHE2\0', 1, vertex_count, start_frame, sample_rate, frame_count))
+
+    def write_frame(self, frame_index, coordinates):
+        self.file.seek(pc2_header.size + frame_index * self.vertex_count * 12)
+        np.ascontiguousarray(coordinates, dtype='<f4').tofile(self.file)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class NumpyCacheWriter:
+
+    # Streams frames into a (frames, vertices, 3) float32 .npy file through a memory map, for post-processing
+    def __init__(self, filepath, vertex_count, frame_count, start_frame=0.0, sample_rate=1.0):
+        self.frames = np.lib.format.open_memmap(filepath, mode='w+', dtype=np.float32, shape=(frame_count, vertex_count, 3))
+
+    def write_frame(self, frame_index, coordinates):
+        self.frames[frame_index] = coordinates
+
+    def close(self):
+        self.frames.flush()
+        del self.frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+cache_writers = {'PC2': PC2Writer, 'NPY': NumpyCacheWriter}
+
+def open_cache_writer(output_mode, filepath, vertex_count, frame_count, start_frame=0.0, sample_rate=1.0):
+    os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+    return cache_writers[output_mode](filepath, vertex_count, frame_count, start_frame, sample_rate)
+
+def attach_mesh_cache(obj, filepath, start_frame, frame_step):
+    # Samples were taken every frame_step frames from start_frame, the modifier reads them lazily during playback
+    modifier = obj.modifiers.new(name="Node Form Cache", type='MESH_CACHE')
+    modifier.cache_format = 'PC2'
+    modifier.filepath = filepath
+    modifier.time_mode = 'FRAME'
+    modifier.play_mode = 'SCENE'
+    modifier.frame_start = start_frame
+    modifier.frame_scale = 1 / frame_step
+    modifier.interpolation = 'LINEAR'
+    return modifier
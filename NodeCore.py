@@ -0,0 +1,558 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+# This module never imports bpy. It runs a Node Form tree on plain arrays, so grids and transforms can be made
+# in batch jobs and on machines without Blender. The add-on calls the same functions with the scene's data.
+
+import os
+import json
+import math
+import types
+import importlib.util
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the path to the module you want to import
+module_name = "NodeEvaluation"  # Name of the module you want to import
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+# Load the module
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+ne = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ne)
+
+module_name = "NodeLattice"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nlt = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nlt)
+
+module_name = "NodePlan"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+npl = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(npl)
+
+module_name = "NodeSubstitution"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nsub = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nsub)
+
+# The settings of every node type as the add-on defines them. A tree description only lists what differs.
+node_defaults = {
+    'SRT': {},
+    'SLT': {'selection_mode': 'SAL', 'selection_name': ''},
+    'DEL': {'deletion_mode': 'DELETE'},
+    'GRD': {
+        'x_offset': '0', 'y_offset': '0', 'z_offset': '0',
+        'x_length': '1', 'y_length': '1', 'z_length': '1',
+        'cube_density_x': '2', 'cube_density_y': '2', 'cube_density_z': '2',
+        'is_hollow': False, 'domain': 'VOLUME', 'domain_axis': 'Z',
+        'is_refined': False, 'refine_tolerance': 0.01,
+        'is_vector_field': False, 'x_vector': '0', 'y_vector': '0', 'z_vector': '1',
+        'is_normalized': False, 'arrow_scale': 0.1,
+    },
+    'TFM': {
+        'x_equation': '[x]', 'y_equation': '[y]', 'z_equation': '[z]',
+        'animation_run_time': '0', 'frames_per_calculation': '2', 'repeats': '0',
+        'transformation_type': 'REGULAR', 'keep_option': 'DELETE',
+        'is_parallel': False, 'output_mode': 'SHAPE_KEYS', 'cache_directory': '//node_form_cache/',
+        'live_cache_frames': 64, 'is_adaptive': False, 'adaptive_tolerance': 0.001,
+        'is_batched': False,
+    },
+    'DCT': {'variable_folder': []},
+    'LIB': {'variable_folder': []},
+    'FIM': {'filepath_name': '', 'module_name': ''},
+    'GAT': {'allowed_to_pass': False},
+    'EXE': {'execution_code': ''},
+}
+
+class TreeNode:
+
+    # A node of a tree description, read through the same attribute names as the add-on's nodes
+    def __init__(self, name, settings):
+        values = dict(node_defaults.get(settings.get('automation_type'), {}))
+        values.update(settings)
+        values['variable_folder'] = [types.SimpleNamespace(**element) for element in values.get('variable_folder', ())]
+        self.__dict__.update(values)
+        self.name = name
+
+class Tree:
+
+    # A tree description: {'nodes': {name: {'automation_type': 'GRD', setting: value, ...}}, 'links': [[from, to], ...]}.
+    # Dictionary nodes list {'variable': ..., 'replacement': ...} and Library nodes {'library_name': ...} under
+    # 'variable_folder', as the add-on stores them.
+    def __init__(self, description):
+        self.nodes = {name: TreeNode(name, settings) for name, settings in description['nodes'].items()}
+        self.links = [tuple(link) for link in description.get('links', ()) if link[0] in self.nodes and link[1] in self.nodes]
+        self.outputs = {name: [] for name in self.nodes}
+        self.inputs = {name: [] for name in self.nodes}
+        for source, target in self.links:
+            self.outputs[source].append(self.nodes[target])
+            self.inputs[target].append(self.nodes[source])
+
+    def output_nodes(self, node):
+        return self.outputs[node.name]
+
+    def input_nodes(self, node):
+        return self.inputs[node.name]
+
+    def start_node(self):
+        return next((node for node in self.nodes.values() if node.automation_type == 'SRT'), None)
+
+    def plan(self):
+        return npl.ExecutionPlan(self.start_node(), self.output_nodes, self.input_nodes, self.links)
+
+def load_tree(filepath):
+    with open(filepath) as file:
+        return Tree(json.load(file))
+
+def append_unique_keys(target, appendage):
+
+    for key, value in appendage.items():
+        # Add to target only if key is not already in target
+        if key not in target:
+            target[key] = value
+        else:
+            print("WARNING: You have more than one definition for: \"" + key + "\"")
+    return target
+
+def substitute_keys_into_values(target, modifier, pattern=None):
+    # Every value of modifier with the keys of target replaced in a single pass. pattern may match more keys
+    # than target has.
+    if pattern is None:
+        return {key: nsub.substitute(target, value) for key, value in modifier.items()}
+    return {key: nsub.substitute_within(target, value, pattern) for key, value in modifier.items()}
+
+def collect_definitions(plan, nodes):
+    # The dictionary, libraries and file imports of the nodes feeding the Start node.
+    # Returns (definitions, library names, [(file path, module name)]).
+    definitions = {}
+    library_names = []
+    file_modules = []
+
+    # A closed gate cuts off everything that only reaches the Start node through it
+    reaches_start = {plan.start_name}
+    for name in reversed(plan.back_order):
+        for successor in plan.back_successors[name]:
+            successor_node = nodes[successor]
+            if successor in reaches_start and not (successor_node.automation_type == 'GAT' and not successor_node.allowed_to_pass):
+                reaches_start.add(name)
+                break
+
+    # The definitions visible to each node: those of every dictionary upstream of it. Every scope is matched
+    # with one pattern of all the keys in the tree, instead of compiling a pattern for each scope.
+    scopes = {}
+    pattern = nsub.get_pattern({element.variable for name in plan.back_order if nodes[name].automation_type == 'DCT' for element in nodes[name].variable_folder})
+
+    for name in plan.back_order:
+
+        if name not in reaches_start:
+            continue
+
+        node = nodes[name]
+        scope = {}
+        for predecessor in plan.back_predecessors[name]:
+            for key, value in scopes.get(predecessor, {}).items():
+                scope.setdefault(key, value)
+
+        if node.automation_type =='DCT':
+
+            temporary_dicationary = {element.variable: element.replacement for element in node.variable_folder}
+
+            if scope:
+                temporary_dicationary = substitute_keys_into_values(scope, temporary_dicationary, pattern)
+
+            append_unique_keys(definitions, temporary_dicationary)
+
+            for key, value in temporary_dicationary.items():
+                scope.setdefault(key, value)
+
+        elif node.automation_type == 'LIB':
+            library_names.extend(library.library_name for library in node.variable_folder)
+
+        elif node.automation_type == 'FIM':
+            file_modules.append((node.filepath_name, node.module_name))
+
+        elif node.automation_type not in ('SRT', 'GAT'):
+            print('Invalid Library or Dictionary Connection')
+
+        scopes[name] = scope
+
+    return definitions, library_names, file_modules
+
+def grid_arguments(node, table, evaluation_context, transform_node=None):
+    # The arguments of grid_arrays for a Grid Create node, plus its arrow scale
+    evaluated_strings = evaluation_context.evaluate([table.substitute(value) for value in [
+                            node.x_length,
+                            node.y_length,
+                            node.z_length,
+                            node.x_offset,
+                            node.y_offset,
+                            node.z_offset,
+                            node.cube_density_x,
+                            node.cube_density_y,
+                            node.cube_density_z,
+                        ]])
+
+    lengths_vector = evaluated_strings[0:3]
+    offset_vector = evaluated_strings[3:6]
+    cube_density_vector = evaluated_strings[6:9]
+
+    # Trees saved before the domain setting existed mark shells with is_hollow
+    domain = 'SHELL' if node.is_hollow else node.domain
+
+    refine_equations = None
+    refine_run_time = 0.0
+
+    if node.is_refined and transform_node is not None:
+        # Cells are refined where the equations of the following Transform bend the lattice
+        refine_equations = [table.substitute(value) for value in [
+            transform_node.x_equation,
+            transform_node.y_equation,
+            transform_node.z_equation,
+        ]]
+        refine_run_time = evaluation_context.evaluate(table.substitute(transform_node.animation_run_time)) or 0.0
+
+    vector_equations = None
+    if node.is_vector_field:
+        vector_equations = [table.substitute(value) for value in [
+            node.x_vector,
+            node.y_vector,
+            node.z_vector,
+        ]]
+
+    return (
+        lengths_vector,
+        offset_vector,
+        cube_density_vector,
+        domain,
+        node.domain_axis,
+        refine_equations,
+        node.refine_tolerance,
+        refine_run_time,
+        vector_equations,
+        node.is_normalized,
+        node.arrow_scale,
+    )
+
+def transform_arguments(node, table, evaluation_context):
+    # The arguments of a Transform node, in the order the add-on's transform takes them
+    variables = [table.substitute(value) for value in [
+        node.x_equation,
+        node.y_equation,
+        node.z_equation,
+    ]]
+
+    evaluated_strings = evaluation_context.evaluate([table.substitute(value) for value in [
+                            node.animation_run_time,
+                            node.frames_per_calculation,
+                            node.repeats,
+                        ]])
+
+    return (
+        variables[0:3],
+        evaluated_strings[0],
+        evaluated_strings[1],
+        evaluated_strings[2],
+        node.transformation_type,
+        node.keep_option,
+        node.is_parallel,
+        node.output_mode,
+        node.cache_directory,
+        node.live_cache_frames,
+        node.is_adaptive,
+        node.adaptive_tolerance,
+        node.is_batched,
+    )
+
+def normalize_vectors(vectors):
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, lengths, out=np.zeros_like(vectors), where=lengths > 0)
+
+def grid_arrays(evaluation_context, lengths_vector, offset_vector, density_vector, domain='VOLUME', domain_axis='Z', refine_equations=None, refine_tolerance=0.01, refine_run_time=0.0, vector_equations=None, is_normalized=False):
+    # Returns (vertices, edges, faces, vectors) of a grid, vectors is None unless it is a vector field
+    xCuts = math.floor(density_vector[0] * abs(lengths_vector[0]))
+    yCuts = math.floor(density_vector[1] * abs(lengths_vector[1]))
+    zCuts = math.floor(density_vector[2] * abs(lengths_vector[2]))
+
+    # Points, segments and shared cell sides come straight from index arithmetic, no copies to join and merge
+    axes = nlt.domain_axes(lengths_vector, offset_vector, (xCuts, yCuts, zCuts), domain, domain_axis)
+    if refine_equations:
+        axes = refine_grid_axes(evaluation_context, axes, refine_equations, refine_tolerance, refine_run_time)
+    vertices, edges, faces = nlt.domain_mesh(axes, domain)
+
+    vectors = None
+    if vector_equations:
+        # A vector field keeps only the points, its arrows are instanced by one geometry nodes modifier
+        edges = edges[:0]
+        faces = faces[:0]
+        vectors = evaluation_context.vector_kernel(vector_equations)(vertices.astype(np.float64), 0.0, 0.0)
+        if is_normalized:
+            vectors = normalize_vectors(vectors)
+
+    return vertices, edges, faces, vectors
+
+def refine_grid_axes(evaluation_context, axes, equations_vector, tolerance, run_time):
+    # The lattice is mapped through the Transform that follows it, at the start and at the end of its run
+    vector_kernel = evaluation_context.vector_kernel(equations_vector)
+    points = nlt.lattice_vertices(axes).astype(np.float64)
+    values = [vector_kernel(points, 0.0, run_time)]
+    if run_time > 0:
+        values.append(vector_kernel(points, run_time, run_time))
+    return nlt.refine_axes(axes, np.concatenate(values, axis=1), tolerance)
+
+def transform_settings(animation_run_time, frames_per_calculation, transformation_type):
+    smoothing_constant = 0.0
+    is_instantaneous = False if animation_run_time > 0 else True
+    framesPerSecond = 24
+    frameDivisor = frames_per_calculation
+    upperRange = int(math.floor(animation_run_time * framesPerSecond / frameDivisor))
+
+    match transformation_type:
+        case 'REGULAR':
+            is_instantaneous = True
+        case 'SMOOTH':
+            smoothing_constant = 1.0
+        case 'LINEAR':
+            pass
+
+    return upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous
+
+def transform_frame_parameters(upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous):
+    frame_parameters = []
+    for frameIndex in range(upperRange+1):
+        remainder = 0
+
+        if not is_instantaneous:
+            remainder = (upperRange - frameIndex) / (upperRange)
+
+        t = ((frameIndex) * frameDivisor) / (framesPerSecond)
+        T = ((upperRange) * frameDivisor) / (framesPerSecond)
+        frame_parameters.append((remainder, smoothing_constant, t, T))
+    return frame_parameters
+
+def transform_frames(evaluation_context, basis, equations_vector, animation_run_time, frames_per_calculation, transformation_type, reserve=None):
+    # Every frame of a Transform from basis as one (frames, vertices, 3) array.
+    # Returns None when reserve refuses the bytes it would take.
+    upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous = transform_settings(animation_run_time, frames_per_calculation, transformation_type)
+    frame_parameters = transform_frame_parameters(upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous)
+    if reserve is not None and not reserve(len(frame_parameters) * basis.size * 4):
+        return None
+
+    vector_kernel = evaluation_context.vector_kernel(equations_vector)
+    scratch = np.empty(basis.shape, dtype=np.float64)
+    frames = np.empty((len(frame_parameters),) + basis.shape, dtype=np.float32)
+    for frameIndex, (remainder, smoothing_constant, t, T) in enumerate(frame_parameters):
+        ne.evaluate_frame(vector_kernel, basis, remainder, smoothing_constant, t, T, frames[frameIndex], scratch)
+    return frames
+
+def adaptive_shape_key_frames(evaluation_context, equations_vector, basis, upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous, tolerance):
+    # Yields (frame offset, coordinates) only where linear interpolation between the kept keys would miss the
+    # motion by more than the tolerance, refining down to single frames where the motion is fast
+    vector_kernel = evaluation_context.vector_kernel(equations_vector)
+    scratch = np.empty(basis.shape, dtype=np.float64)
+    run_frames = upperRange * frameDivisor
+    T = run_frames / framesPerSecond
+
+    def evaluate(position):
+        remainder = 0 if is_instantaneous else (run_frames - position) / run_frames
+        return ne.evaluate_frame(vector_kernel, basis, remainder, smoothing_constant, position / framesPerSecond, T, None, scratch)
+
+    if is_instantaneous and not evaluation_context.references(equations_vector, '[t]'):
+        # Nothing moves, every frame would be the same
+        return iter([(0.0, evaluate(0.0))])
+
+    positions = [frameIndex * frameDivisor for frameIndex in range(upperRange + 1)]
+    return ne.adaptive_frames(evaluate, positions, tolerance, min(1.0, frameDivisor))
+
+class MeshObject:
+
+    # What a run makes in place of a Blender object: the mesh arrays and the (frame, coordinates) of its keys
+    def __init__(self, name, vertices, edges, faces, vectors=None, frames=()):
+        self.name = name
+        self.vertices = vertices
+        self.edges = edges
+        self.faces = faces
+        self.vectors = vectors
+        self.frames = list(frames)
+        self.selected = False
+        self.hidden = False
+
+    def positions(self):
+        # The frame each key peaks on
+        return np.array([frame for frame, coordinates in self.frames], dtype=np.float64)
+
+    def coordinates(self):
+        # The coordinates of every key as one (keys, vertices, 3) array
+        return np.stack([coordinates for frame, coordinates in self.frames]) if self.frames else np.empty((0,) + self.vertices.shape, dtype=np.float32)
+
+class Scene:
+
+    # The objects a run has made and which of them are selected, in the order they were made
+    def __init__(self):
+        self.objects = {}
+        self.frame_end = 0
+
+    def unique_name(self, name):
+        # Like Blender, a copy of "Mesh.001" is "Mesh.002" and not "Mesh.001.001"
+        if name not in self.objects:
+            return name
+        base, dot, suffix = name.rpartition('.')
+        if dot and suffix.isdigit():
+            name = base
+        index = 1
+        while f'{name}.{index:03d}' in self.objects:
+            index += 1
+        return f'{name}.{index:03d}'
+
+    def add(self, obj):
+        obj.name = self.unique_name(obj.name)
+        self.objects[obj.name] = obj
+        return obj
+
+    def selected_objects(self):
+        return [obj for obj in self.objects.values() if obj.selected]
+
+    def select(self, selection_mode, selection_name=''):
+        match selection_mode:
+            case 'SAL':
+                for obj in self.objects.values():
+                    obj.selected = True
+            case 'DSAL':
+                for obj in self.objects.values():
+                    obj.selected = False
+            case 'SBN' | 'DSBN':
+                obj = self.objects.get(selection_name)
+                if obj:
+                    obj.selected = selection_mode == 'SBN'
+
+    def delete_selected(self, deletion_mode):
+        for obj in self.selected_objects():
+            if deletion_mode == 'DELETE':
+                del self.objects[obj.name]
+            else:
+                obj.hidden = True
+
+def transform_object(scene, evaluation_context, obj, arguments):
+    # One pass of a Transform over one object, the headless counterpart of the add-on's shape key output
+    equations_vector, animation_run_time, frames_per_calculation, repeats, transformation_type, keep_option = arguments[:6]
+    is_adaptive, adaptive_tolerance = arguments[10:12]
+
+    upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous = transform_settings(animation_run_time, frames_per_calculation, transformation_type)
+
+    # A transformed object continues from its last key, which the new keys replace
+    startframe = obj.frames[-1][0] if obj.frames else 0.0
+    basis = np.asarray(obj.frames[-1][1] if obj.frames else obj.vertices, dtype=np.float64)
+
+    if is_adaptive:
+        frames = adaptive_shape_key_frames(evaluation_context, equations_vector, basis, upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous, adaptive_tolerance)
+        frames = [(position + startframe, coordinates.astype(np.float32)) for position, coordinates in frames]
+    else:
+        coordinates = transform_frames(evaluation_context, basis, equations_vector, animation_run_time, frames_per_calculation, transformation_type)
+        frames = [(frameIndex * frameDivisor + startframe, coordinates[frameIndex]) for frameIndex in range(len(coordinates))]
+
+    duplicate = scene.add(MeshObject(obj.name, obj.vertices, obj.edges, obj.faces, obj.vectors, obj.frames[:-1] + frames))
+    duplicate.selected = True
+    obj.selected = False
+
+    match keep_option:
+        case 'HIDE':
+            obj.hidden = True
+        case 'DELETE':
+            del scene.objects[obj.name]
+
+    scene.frame_end = int(upperRange*frameDivisor + startframe)
+
+def execute_node(scene, tree, node, table, evaluation_context):
+
+    match getattr(node, 'automation_type', None):
+
+        case 'GAT':
+            if not node.allowed_to_pass:
+                return 'BREAK'
+
+        case 'SLT':
+            scene.select(node.selection_mode, node.selection_name)
+
+        case 'DEL':
+            scene.delete_selected(node.deletion_mode)
+
+        case 'GRD':
+            transform_node = next((output for output in tree.output_nodes(node) if output.automation_type == 'TFM'), None)
+            arguments = grid_arguments(node, table, evaluation_context, transform_node)
+            vertices, edges, faces, vectors = grid_arrays(evaluation_context, *arguments[:-1])
+
+            # A new grid is added to the selection
+            scene.add(MeshObject("Mesh", vertices, edges, faces, vectors)).selected = True
+
+        case 'TFM':
+            arguments = transform_arguments(node, table, evaluation_context)
+            for _ in range(int(arguments[3])+1):
+                for obj in scene.selected_objects():
+                    if len(obj.vertices) > 0:
+                        transform_object(scene, evaluation_context, obj, arguments)
+
+        case 'EXE':
+            print('Execute node skipped, its code needs Blender: ' + node.name)
+
+def run_tree(tree):
+    # Runs every node after the Start node, in the same order as the add-on, and returns the Scene it made
+    plan = tree.plan()
+    definitions, library_names, file_modules = collect_definitions(plan, tree.nodes)
+    table = nsub.SubstitutionTable(definitions)
+    evaluation_context = ne.EvaluationContext(library_names, file_modules)
+
+    scene = Scene()
+    passed = {plan.start_name}
+    for name in plan.order:
+        if not any(predecessor in passed for predecessor in plan.predecessors[name]):
+            continue # Every node linking into this one was stopped by a gate
+        if execute_node(scene, tree, tree.nodes[name], table, evaluation_context) != 'BREAK':
+            passed.add(name)
+    return scene
+
+def save_scene(scene, filepath):
+    # Every object's arrays in one .npz, keyed by object name and array
+    arrays = {}
+    for obj in scene.objects.values():
+        arrays[obj.name + '/vertices'] = obj.vertices
+        arrays[obj.name + '/edges'] = obj.edges
+        arrays[obj.name + '/faces'] = obj.faces
+        if obj.vectors is not None:
+            arrays[obj.name + '/vectors'] = obj.vectors
+        if obj.frames:
+            arrays[obj.name + '/positions'] = obj.positions()
+            arrays[obj.name + '/frames'] = obj.coordinates()
+    np.savez(filepath, **arrays)
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) != 3:
+        print('Usage: python NodeCore.py tree.json output.npz')
+        sys.exit(1)
+    save_scene(run_tree(load_tree(sys.argv[1])), sys.argv[2])
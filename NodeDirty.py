@@ -0,0 +1,167 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import os
+import json
+import hashlib
+import bpy
+import numpy as np
+
+# Objects made by a cached node carry the signature of the run that made them
+signature_property = 'node_form_signature'
+
+# Nodes whose results are kept between runs, everything else is cheap enough to always execute
+cached_types = ('GRD', 'TFM')
+
+# Properties that describe how a node is drawn, not what it does
+ignored_properties = ('cache_record', 'run_report')
+
+def make_signature(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+def node_settings(node):
+    settings = []
+    for cls in reversed(type(node).__mro__):
+        for name in getattr(cls, '__annotations__', {}):
+            if name not in ignored_properties and hasattr(node, name):
+                value = getattr(node, name)
+                settings.append((name, value if isinstance(value, (str, int, float, bool)) else str(value)))
+    return settings
+
+def run_signature(replacement_dictionary, library_collection, filepath_collection):
+    # Everything a node's strings are resolved against, including the contents of imported files
+    files = []
+    for element in filepath_collection:
+        filepath = bpy.path.abspath(element.filepath_name)
+        modified = os.path.getmtime(filepath) if os.path.isfile(filepath) else None
+        files.append((element.filepath_name, element.module_name, modified))
+    libraries = [library.library_name for library in library_collection]
+    return make_signature(sorted(replacement_dictionary.items()), libraries, files)
+
+def object_fingerprint(obj):
+    # Node Form output is identified by the signature that made it, anything else by its geometry
+    signature = obj.get(signature_property)
+    if signature is not None:
+        return signature
+    mesh = obj.data
+    coordinates = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', coordinates)
+    shape_keys = tuple(mesh.shape_keys.key_blocks.keys()) if mesh.shape_keys else ()
+    return (obj.name, hashlib.sha1(coordinates.tobytes()).hexdigest(), shape_keys)
+
+def selection_fingerprint():
+    return sorted(repr(object_fingerprint(obj)) for obj in bpy.context.selected_objects if obj.type == 'MESH')
+
+def node_signature(node, upstream_signature, run_nonce):
+    match getattr(node, 'automation_type', None):
+        case 'EXE':
+            # Arbitrary code can do anything, so it and everything after it counts as changed
+            return make_signature(upstream_signature, node_settings(node), run_nonce)
+        case 'TFM':
+            # A Transform works on whatever is selected when it is reached
+            return make_signature(upstream_signature, node_settings(node), selection_fingerprint())
+    return make_signature(upstream_signature, node_settings(node))
+
+def get_records(node):
+    try:
+        return json.loads(node.cache_record) if node.cache_record else {}
+    except ValueError:
+        return {}
+
+def set_records(node, records):
+    node.cache_record = json.dumps(records)
+
+def outputs_exist(record, signature):
+    for name in record['objects']:
+        obj = bpy.data.objects.get(name)
+        if obj is None or obj.get(signature_property) != signature:
+            return False
+    return True
+
+def find_reusable(node, signature):
+    if getattr(node, 'automation_type', None) not in cached_types:
+        return None
+    record = get_records(node).get(signature)
+    if record is None or not outputs_exist(record, signature):
+        return None
+    return record
+
+def object_names():
+    return set(bpy.data.objects.keys())
+
+def remove_outputs(record, signature):
+    for name in record['objects']:
+        obj = bpy.data.objects.get(name)
+        if obj is not None and obj.get(signature_property) == signature:
+            bpy.data.objects.remove(obj, do_unlink=True)
+
+def record_outputs(node, signature, names_before, run_state):
+    # Without caching nothing is tracked and nothing a run made is ever removed
+    if not run_state['use_cache']:
+        return
+    created = sorted(object_names() - names_before)
+    run_state['created'].update(created)
+    if getattr(node, 'automation_type', None) not in cached_types:
+        return
+
+    # The node ran again, so what it made before is replaced, even when it was made with the same signature
+    for old_signature, record in get_records(node).items():
+        remove_outputs(record, old_signature)
+
+    for name in created:
+        bpy.data.objects[name][signature_property] = signature
+    run_state['records'][node.name] = {signature: {'objects': created, 'frame_end': bpy.context.scene.frame_end}}
+
+def restore_outputs(node, signature, record, run_state):
+    # Leaves the selection as running the node would have
+    objects = [bpy.data.objects[name] for name in record['objects']]
+
+    if node.automation_type == 'TFM':
+        for obj in list(bpy.context.selected_objects):
+            obj.select_set(False)
+            # Inputs that upstream nodes rebuilt this run are consumed the same way as the first time
+            if obj.type == 'MESH' and obj.name in run_state['created']:
+                match node.keep_option:
+                    case 'HIDE':
+                        obj.hide_set(True)
+                    case 'DELETE':
+                        bpy.data.objects.remove(obj, do_unlink=True)
+        bpy.context.scene.frame_end = record['frame_end']
+
+    for obj in objects:
+        if obj.name in bpy.context.view_layer.objects and obj.visible_get():
+            obj.select_set(True)
+    if objects:
+        bpy.context.view_layer.objects.active = objects[-1]
+
+    for old_signature, old_record in get_records(node).items():
+        if old_signature != signature:
+            remove_outputs(old_record, old_signature)
+    run_state['records'][node.name] = {signature: record}
+
+def save_records(node_tree, run_state):
+    # Only the nodes that ran or were reused get new records, the others keep theirs
+    if not run_state['use_cache']:
+        return
+    for node_name, records in run_state['records'].items():
+        node = node_tree.nodes.get(node_name)
+        if node is not None:
+            set_records(node, records)
+
+def new_run_state(use_cache=True):
+    return {'use_cache': use_cache, 'created': set(), 'records': {}}
@@ -0,0 +1,315 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import math
+import types
+import hashlib
+import importlib
+import importlib.util
+import os
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the path to the module you want to import
+module_name = "NodeExpression"  # Name of the module you want to import
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+# Load the module
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nx = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nx)
+
+# The bracketed variables are not valid python names, so they are renamed before compiling
+variable_tokens = {'[x]': '_x', '[y]': '_y', '[z]': '_z', '[t]': '_t', '[T]': '_T'}
+
+# Code objects do not depend on the namespace, so they are shared by every run
+compiled_expressions = {}
+
+# Called with the number of expressions evaluated (equations times points for arrays), set by whoever counts them
+count_evaluations = None
+
+# Called with the expressions that could not be vectorized and were evaluated per vertex, set by whoever reports them
+note_per_vertex = None
+
+def tokens_to_names(expression):
+    for token, name in variable_tokens.items():
+        expression = expression.replace(token, name)
+    return expression
+
+def compile_expression(expression):
+    code = compiled_expressions.get(expression)
+    if code is None:
+        code = compile(tokens_to_names(expression), '<node form>', 'eval')
+        compiled_expressions[expression] = code
+    return code
+
+def numpy_log(x, base=None):
+    return np.log(x) if base is None else np.log(x) / np.log(base)
+
+# A stand-in for the math module whose functions work on whole arrays. Anything not mapped
+# stays the scalar math function, which raises on arrays and sends that expression to the scalar path
+numpy_math = types.ModuleType('math')
+numpy_math.__dict__.update({name: value for name, value in math.__dict__.items() if not name.startswith('__')})
+numpy_math.__dict__.update({
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan, 'atan2': np.arctan2,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'asinh': np.arcsinh, 'acosh': np.arccosh, 'atanh': np.arctanh,
+    'exp': np.exp, 'expm1': np.expm1, 'log': numpy_log, 'log2': np.log2, 'log10': np.log10, 'log1p': np.log1p,
+    'sqrt': np.sqrt, 'pow': np.power, 'fabs': np.fabs, 'hypot': np.hypot, 'fmod': np.fmod,
+    'floor': np.floor, 'ceil': np.ceil, 'trunc': np.trunc, 'copysign': np.copysign,
+    'degrees': np.degrees, 'radians': np.radians,
+})
+
+# Functions the expression graph may share between equations and fold when their arguments are constant
+pure_functions = [value for value in list(math.__dict__.values()) + list(numpy_math.__dict__.values()) if callable(value)]
+
+# File Import modules by path: (modification time, content hash, module). A module is executed again only when
+# its file changed, so top-level work in the file runs once per edit instead of once per run.
+file_module_cache = {}
+
+def file_digest(file_path):
+    with open(file_path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def load_file_module(file_path):
+    modification_time = os.path.getmtime(file_path)
+    cached = file_module_cache.get(file_path)
+    if cached is not None and cached[0] == modification_time:
+        return cached[2]
+
+    # A touched but unchanged file keeps its module
+    digest = file_digest(file_path)
+    if cached is not None and cached[1] == digest:
+        file_module_cache[file_path] = (modification_time, digest, cached[2])
+        return cached[2]
+
+    # Extract the module name from the file path
+    module_name = file_path.split('/')[-1].replace('.py', '')
+    # Create a module spec
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    # Create a new module based on the spec
+    module = importlib.util.module_from_spec(spec)
+    # Execute the module in its own namespace
+    spec.loader.exec_module(module)
+    file_module_cache[file_path] = (modification_time, digest, module)
+    return module
+
+def clear_file_modules():
+    file_module_cache.clear()
+
+def build_namespace(library_names, file_modules):
+
+    namespace = {'__builtins__': __builtins__}
+
+    for library_name in library_names:
+        try:
+            namespace[library_name] = importlib.import_module(library_name)
+        except ImportError:
+            print('no library imported')
+
+    for file_path, module_name in file_modules:
+        try:
+            namespace[module_name] = load_file_module(file_path)
+        except Exception as e:  # Catch broader exceptions if the loading or executing fails
+            print(f'Failed to import {file_path}: {str(e)}')
+
+    return namespace
+
+class EvaluationContext:
+
+    # Holds the namespace for one run so libraries and files are imported once, not per evaluation
+    def __init__(self, library_names=(), file_modules=()):
+        self.library_names = tuple(library_names)
+        self.file_modules = tuple(tuple(file_module) for file_module in file_modules)
+        self.namespace = build_namespace(library_names, file_modules)
+        self.vector_namespace = {name: numpy_math if value is math else value for name, value in self.namespace.items()}
+        self.group_functions = {}
+        self.vector_kernels = {}
+        self.scalar_only_expressions = set()
+
+    def evaluate(self, input, x=None, y=None, z=None, t=None, T=None):
+
+        expressions = [input] if isinstance(input, str) else input
+        variables = dict(zip(variable_tokens.values(), (x, y, z, t, T)))
+        if count_evaluations is not None:
+            count_evaluations(len(expressions))
+
+        return_list = []
+        for item in expressions:
+            try:
+                return_list.append(eval(compile_expression(item), self.namespace, variables))
+            except TypeError:
+                print('Expression is not evaluable')
+                return_list.append(None)
+
+        return return_list[0] if isinstance(input, str) else return_list
+
+    def group_function(self, equations, vectorized):
+        # The equations are compiled together through the expression graph, so terms they share are computed once
+        key = (equations, vectorized)
+        function = self.group_functions.get(key)
+        if function is None:
+            namespace = self.vector_namespace if vectorized else self.namespace
+            function = nx.compile_group(
+                [tokens_to_names(equation) for equation in equations],
+                namespace,
+                list(variable_tokens.values()),
+                pure_functions,
+            )
+            self.group_functions[key] = function
+        return function
+
+    def kernel(self, equations):
+        # Returns f(x, y, z, t, T) -> (X, Y, Z); identical equations share a single compiled kernel
+        return self.group_function(tuple(equations), False)
+
+    def evaluate_arrays(self, equations, x, y, z, t, T):
+
+        count = len(x)
+        results = {}
+
+        def as_column(value):
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (count,))
+
+        vectorized = tuple(equation for equation in equations if equation not in self.scalar_only_expressions)
+
+        if vectorized:
+            try:
+                for equation, value in zip(vectorized, self.group_function(vectorized, True)(x, y, z, t, T)):
+                    results[equation] = as_column(value)
+            except Exception:
+                # Only the expressions that fail on their own fall back, the others stay vectorized
+                results.clear()
+                for equation in vectorized:
+                    try:
+                        results[equation] = as_column(self.group_function((equation,), True)(x, y, z, t, T)[0])
+                    except Exception:
+                        self.scalar_only_expressions.add(equation)
+
+        scalar = tuple(equation for equation in equations if equation not in results)
+
+        if scalar:
+            if note_per_vertex is not None:
+                note_per_vertex(scalar)
+            function = self.group_function(scalar, False)
+            values = np.array(
+                [function(xi, yi, zi, t, T) for xi, yi, zi in zip(x.tolist(), y.tolist(), z.tolist())],
+                dtype=np.float64,
+            ).reshape(count, len(scalar))
+            for column, equation in enumerate(scalar):
+                results[equation] = values[:, column]
+
+        return [results[equation] for equation in equations]
+
+    def expression_graph(self, equations):
+        # The equations parsed together, with the functions they call resolved against this run's imports
+        return nx.build_graph([tokens_to_names(equation) for equation in equations], self.namespace, list(variable_tokens.values()), pure_functions)
+
+    def references(self, equations, token):
+        # Whether any of the equations depends on a bracketed variable such as [t]
+        graph = nx.build_graph([tokens_to_names(equation) for equation in equations], self.vector_namespace, list(variable_tokens.values()), pure_functions)
+        return graph.references(variable_tokens[token])
+
+    def vector_kernel(self, equations):
+        # Returns f(coordinates, t, T, out) evaluating the X/Y/Z equations over an (N,3) array
+        equations = tuple(equations)
+        kernel = self.vector_kernels.get(equations)
+        if kernel is None:
+            def kernel(coordinates, t, T, out=None):
+                if out is None:
+                    out = np.empty(coordinates.shape, dtype=np.float64)
+                x, y, z = coordinates[:, 0], coordinates[:, 1], coordinates[:, 2]
+                if count_evaluations is not None:
+                    count_evaluations(len(coordinates) * len(equations))
+                for axis, values in enumerate(self.evaluate_arrays(equations, x, y, z, t, T)):
+                    out[:, axis] = values
+                return out
+            self.vector_kernels[equations] = kernel
+        return kernel
+
+def evaluate_frame(vector_kernel, basis, remainder, smoothing_constant, t, T, out=None, scratch=None):
+    # SMOOTH and LINEAR runs evaluate the shrunken basis and add back the remaining part of the original
+    out = vector_kernel(np.multiply(basis, 1 - remainder, out=scratch), t, T, out)
+    if remainder * smoothing_constant != 0:
+        out += np.multiply(basis, remainder * smoothing_constant, out=scratch)
+    return out
+
+def bake_frames(vector_kernel, basis, frame_parameters, out=None, scratch=None):
+    # Yields (frame_index, coordinates); frame_parameters holds (remainder, smoothing_constant, t, T) per frame
+    for frame_index, (remainder, smoothing_constant, t, T) in enumerate(frame_parameters):
+        yield frame_index, evaluate_frame(vector_kernel, basis, remainder, smoothing_constant, t, T, out, scratch)
+
+def interpolation_error(start, end, sample, fraction):
+    # Largest distance of any vertex from where linear interpolation between start and end puts it
+    if len(sample) == 0:
+        return 0.0
+    expected = start + (end - start) * fraction
+    return float(np.sqrt(((sample - expected) ** 2).sum(axis=1).max()))
+
+def refine_interval(evaluate, left, right, tolerance, min_step):
+    position = (left[0] + right[0]) / 2
+    if position - left[0] < min_step:
+        return
+    middle = (position, evaluate(position))
+    if interpolation_error(left[1], right[1], middle[1], 0.5) <= tolerance:
+        return
+    yield from refine_interval(evaluate, left, middle, tolerance, min_step)
+    yield middle
+    yield from refine_interval(evaluate, middle, right, tolerance, min_step)
+
+def refine_frames(evaluate, positions, tolerance, min_step):
+    # Yields (position, coordinates) for every position, with extra positions in between wherever the motion
+    # between two of them is too fast for linear interpolation to follow
+    previous = None
+    for position in positions:
+        current = (position, evaluate(position))
+        if previous is not None:
+            yield from refine_interval(evaluate, previous, current, tolerance, min_step)
+        yield current
+        previous = current
+
+def simplify_frames(samples, tolerance, max_window):
+    # Drops every sample that linear interpolation between the samples kept around it reproduces within
+    # tolerance. At most max_window undecided samples are held at once.
+    samples = iter(samples)
+    anchor = next(samples, None)
+    if anchor is None:
+        return
+    yield anchor
+
+    window = []
+    for sample in samples:
+        if window:
+            span = sample[0] - anchor[0]
+            if len(window) >= max_window or any(
+                interpolation_error(anchor[1], sample[1], held[1], (held[0] - anchor[0]) / span) > tolerance for held in window
+            ):
+                anchor = window[-1]
+                yield anchor
+                window = []
+        window.append(sample)
+
+    if window:
+        yield window[-1]
+
+def adaptive_frames(evaluate, positions, tolerance, min_step, max_window=16):
+    # evaluate(position) must return a new array each call, since several frames are held at once
+    return simplify_frames(refine_frames(evaluate, positions, tolerance, min_step), tolerance, max_window)
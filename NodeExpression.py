@@ -0,0 +1,297 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import ast
+import math
+import types
+import operator
+
+binary_operators = {
+    ast.Add: ('+', operator.add),
+    ast.Sub: ('-', operator.sub),
+    ast.Mult: ('*', operator.mul),
+    ast.Div: ('/', operator.truediv),
+    ast.FloorDiv: ('//', operator.floordiv),
+    ast.Mod: ('%', operator.mod),
+    ast.Pow: ('**', operator.pow),
+}
+
+unary_operators = {
+    ast.USub: ('-', operator.neg),
+    ast.UAdd: ('+', operator.pos),
+}
+
+operator_functions = {symbol: function for symbol, function in list(binary_operators.values()) + list(unary_operators.values())}
+
+pure_builtins = (abs, min, max, pow, round)
+
+def is_constant_value(value):
+    return isinstance(value, (int, float, complex)) and not isinstance(value, bool)
+
+class ExpressionGraph:
+
+    # The equations of one Transform node parsed into a single graph. Every node is hash-consed, so a
+    # term written in more than one equation (or twice in one) is stored and evaluated once.
+    # Node layouts:
+    #   ('const', value)    ('var', name)    ('global', name)    ('attr', base, name)
+    #   ('call', function, args, keywords)    ('binop', symbol, left, right)    ('unary', symbol, operand)
+    #   ('opaque', source)  for syntax the graph does not model, which is kept as written
+    def __init__(self, namespace, variables, pure_functions=()):
+        self.namespace = namespace
+        self.variables = set(variables)
+        self.pure_functions = list(pure_functions) + list(pure_builtins)
+        self.nodes = []
+        self.node_keys = {}
+        self.roots = []
+        self.unique_count = 0
+
+    def add_node(self, node, key=None):
+        key = node if key is None else key
+        index = self.node_keys.get(key)
+        if index is None:
+            index = len(self.nodes)
+            self.nodes.append(node)
+            self.node_keys[key] = index
+        return index
+
+    def unique_key(self, node):
+        # Calls to functions that may not be pure and opaque code are never shared
+        self.unique_count += 1
+        return node + (('unique', self.unique_count),)
+
+    def constant(self, value):
+        return self.add_node(('const', value), ('const', type(value).__name__, repr(value)))
+
+    def constant_value(self, index):
+        node = self.nodes[index]
+        return node[1] if node[0] == 'const' else None
+
+    def is_constant(self, index, value=None):
+        node = self.nodes[index]
+        return node[0] == 'const' and (value is None or (node[1] == value and not isinstance(node[1], complex)))
+
+    def resolve(self, index):
+        # The object a global or attribute node refers to, or None when it cannot be known at compile time
+        node = self.nodes[index]
+        if node[0] == 'global':
+            if node[1] in self.namespace:
+                return self.namespace[node[1]]
+            builtins = self.namespace.get('__builtins__')
+            builtins = builtins.__dict__ if isinstance(builtins, types.ModuleType) else builtins
+            return builtins.get(node[1]) if builtins else None
+        if node[0] == 'attr':
+            base = self.resolve(node[1])
+            if isinstance(base, types.ModuleType):
+                return getattr(base, node[2], None)
+        return None
+
+    def is_pure(self, function):
+        return any(function is pure for pure in self.pure_functions)
+
+    def add_equation(self, source):
+        self.roots.append(self.visit(ast.parse(source, mode='eval').body))
+        return self.roots[-1]
+
+    def visit(self, tree):
+
+        if isinstance(tree, ast.Constant) and is_constant_value(tree.value):
+            return self.constant(tree.value)
+
+        if isinstance(tree, ast.Name):
+            if tree.id in self.variables:
+                return self.add_node(('var', tree.id))
+            return self.add_node(('global', tree.id))
+
+        if isinstance(tree, ast.Attribute):
+            index = self.add_node(('attr', self.visit(tree.value), tree.attr))
+            value = self.resolve(index)
+            # Module constants such as math.pi are folded
+            return self.constant(value) if is_constant_value(value) else index
+
+        if isinstance(tree, ast.BinOp) and type(tree.op) in binary_operators:
+            return self.binary(binary_operators[type(tree.op)][0], self.visit(tree.left), self.visit(tree.right))
+
+        if isinstance(tree, ast.UnaryOp) and type(tree.op) in unary_operators:
+            return self.unary(unary_operators[type(tree.op)][0], self.visit(tree.operand))
+
+        if isinstance(tree, ast.Call) and not any(isinstance(arg, ast.Starred) for arg in tree.args) and all(keyword.arg for keyword in tree.keywords):
+            function = self.visit(tree.func)
+            arguments = tuple(self.visit(arg) for arg in tree.args)
+            keywords = tuple((keyword.arg, self.visit(keyword.value)) for keyword in tree.keywords)
+            return self.call(function, arguments, keywords)
+
+        return self.add_node(self.unique_key(('opaque', ast.unparse(tree))))
+
+    def fold(self, function, operands):
+        try:
+            value = function(*operands)
+        except Exception:
+            return None
+        return value if is_constant_value(value) else None
+
+    def binary(self, symbol, left, right):
+
+        # Huge integer powers are left for run time instead of being computed while compiling
+        if self.is_constant(left) and self.is_constant(right) and not (symbol == '**' and abs(self.constant_value(right)) > 256):
+            value = self.fold(operator_functions[symbol], (self.constant_value(left), self.constant_value(right)))
+            if value is not None:
+                return self.constant(value)
+
+        # Strength reduction and identities
+        if symbol == '**' and self.is_constant(right, 1):
+            return left
+        if symbol == '**' and self.is_constant(right, 2):
+            return self.binary('*', left, left)
+        if symbol == '**' and self.is_constant(right, 3):
+            return self.binary('*', self.binary('*', left, left), left)
+        if symbol in ('*', '/') and self.is_constant(right, 1):
+            return left
+        if symbol == '*' and self.is_constant(left, 1):
+            return right
+        if symbol in ('+', '-') and self.is_constant(right, 0):
+            return left
+        if symbol == '+' and self.is_constant(left, 0):
+            return right
+
+        return self.add_node(('binop', symbol, left, right))
+
+    def unary(self, symbol, operand):
+        if self.is_constant(operand):
+            value = self.fold(operator_functions[symbol], (self.constant_value(operand),))
+            if value is not None:
+                return self.constant(value)
+        return self.add_node(('unary', symbol, operand))
+
+    def call(self, function, arguments, keywords):
+        node = ('call', function, arguments, keywords)
+        target = self.resolve(function)
+
+        if target is None or not self.is_pure(target):
+            return self.add_node(self.unique_key(node))
+
+        if all(self.is_constant(argument) for argument in arguments) and all(self.is_constant(value) for name, value in keywords):
+            value = self.fold(lambda: target(*[self.constant_value(a) for a in arguments], **{n: self.constant_value(v) for n, v in keywords}), ())
+            if value is not None:
+                return self.constant(value)
+
+        return self.add_node(node)
+
+    def children(self, index):
+        node = self.nodes[index]
+        match node[0]:
+            case 'attr':
+                return [node[1]]
+            case 'call':
+                return [node[1]] + list(node[2]) + [value for name, value in node[3]]
+            case 'binop':
+                return [node[2], node[3]]
+            case 'unary':
+                return [node[2]]
+        return []
+
+    def ordered_nodes(self):
+        # Post-order over everything reachable from the roots, without recursion
+        order = []
+        visited = set()
+        for root in self.roots:
+            stack = [(root, False)]
+            while stack:
+                index, expanded = stack.pop()
+                if expanded:
+                    order.append(index)
+                elif index not in visited:
+                    visited.add(index)
+                    stack.append((index, True))
+                    stack.extend((child, False) for child in reversed(self.children(index)))
+        return order
+
+    def references(self, name):
+        for index in self.ordered_nodes():
+            node = self.nodes[index]
+            if node == ('var', name):
+                return True
+            # Opaque code is searched as written
+            if node[0] == 'opaque' and any(isinstance(tree, ast.Name) and tree.id == name for tree in ast.walk(ast.parse(node[1], mode='eval'))):
+                return True
+        return False
+
+    def generate_source(self, function_name, arguments):
+
+        order = self.ordered_nodes()
+        use_counts = {}
+        for index in order:
+            for child in self.children(index):
+                use_counts[child] = use_counts.get(child, 0) + 1
+        for root in self.roots:
+            use_counts[root] = use_counts.get(root, 0) + 1
+
+        constants = {}
+        expressions = {}
+        lines = []
+
+        for index in order:
+            node = self.nodes[index]
+            match node[0]:
+                case 'const':
+                    value = node[1]
+                    if isinstance(value, float) and not math.isfinite(value) or isinstance(value, complex):
+                        name = '_k' + str(index)
+                        constants[name] = value
+                        text = name
+                    else:
+                        text = '(' + repr(value) + ')' if value < 0 else repr(value)
+                case 'var' | 'global':
+                    text = node[1]
+                case 'attr':
+                    text = expressions[node[1]] + '.' + node[2]
+                case 'call':
+                    parts = [expressions[argument] for argument in node[2]] + [name + '=' + expressions[value] for name, value in node[3]]
+                    text = expressions[node[1]] + '(' + ', '.join(parts) + ')'
+                case 'binop':
+                    text = '(' + expressions[node[2]] + ' ' + node[1] + ' ' + expressions[node[3]] + ')'
+                case 'unary':
+                    text = '(' + node[1] + expressions[node[2]] + ')'
+                case 'opaque':
+                    text = '(' + node[1] + ')'
+
+            # Anything used more than once is computed into a temporary
+            if node[0] in ('call', 'binop', 'unary', 'opaque') and use_counts.get(index, 0) > 1:
+                name = '_c' + str(index)
+                lines.append('    ' + name + ' = ' + text)
+                text = name
+
+            expressions[index] = text
+
+        lines.append('    return (' + ''.join(expressions[root] + ', ' for root in self.roots) + ')')
+        source = 'def ' + function_name + '(' + ', '.join(arguments) + '):\n' + '\n'.join(lines) + '\n'
+        return source, constants
+
+def build_graph(equations, namespace, variables, pure_functions=()):
+    graph = ExpressionGraph(namespace, variables, pure_functions)
+    for equation in equations:
+        graph.add_equation(equation)
+    return graph
+
+def compile_group(equations, namespace, variables, pure_functions=()):
+    # Returns f(*variables) -> tuple with one value per equation
+    graph = build_graph(equations, namespace, variables, pure_functions)
+    source, constants = graph.generate_source('node_form_kernel', variables)
+    function_globals = dict(namespace)
+    function_globals.update(constants)
+    exec(compile(source, '<node form kernel>', 'exec'), function_globals)
+    return function_globals['node_form_kernel']
@@ -0,0 +1,102 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import bpy
+import numpy as np
+
+# The vector of every point is stored on the mesh, the arrows are instanced from it when the mesh is drawn
+vector_attribute = 'node_form_vector'
+arrow_group_name = 'Node Form Arrows'
+
+def write_vectors(mesh, vectors):
+    if vector_attribute in mesh.attributes:
+        mesh.attributes.remove(mesh.attributes[vector_attribute])
+    attribute = mesh.attributes.new(vector_attribute, 'FLOAT_VECTOR', 'POINT')
+    attribute.data.foreach_set('vector', np.ascontiguousarray(vectors, dtype=np.float32).ravel())
+
+def build_arrow_group():
+    group = bpy.data.node_groups.new(arrow_group_name, 'GeometryNodeTree')
+    group.interface.new_socket('Geometry', in_out='INPUT', socket_type='NodeSocketGeometry')
+    scale_socket = group.interface.new_socket('Scale', in_out='INPUT', socket_type='NodeSocketFloat')
+    scale_socket.default_value = 0.1
+    group.interface.new_socket('Geometry', in_out='OUTPUT', socket_type='NodeSocketGeometry')
+
+    nodes = group.nodes
+    links = group.links
+
+    group_input = nodes.new('NodeGroupInput')
+    group_output = nodes.new('NodeGroupOutput')
+
+    # One arrow pointing along +Z with its tail at the origin, shared by every point
+    shaft = nodes.new('GeometryNodeMeshCylinder')
+    shaft.inputs['Vertices'].default_value = 8
+    shaft.inputs['Radius'].default_value = 0.02
+    shaft.inputs['Depth'].default_value = 0.8
+    shaft_transform = nodes.new('GeometryNodeTransform')
+    shaft_transform.inputs['Translation'].default_value = (0.0, 0.0, 0.4)
+    links.new(shaft.outputs['Mesh'], shaft_transform.inputs['Geometry'])
+
+    head = nodes.new('GeometryNodeMeshCone')
+    head.inputs['Vertices'].default_value = 8
+    head.inputs['Radius Bottom'].default_value = 0.06
+    head.inputs['Depth'].default_value = 0.2
+    head_transform = nodes.new('GeometryNodeTransform')
+    head_transform.inputs['Translation'].default_value = (0.0, 0.0, 0.9)
+    links.new(head.outputs['Mesh'], head_transform.inputs['Geometry'])
+
+    arrow = nodes.new('GeometryNodeJoinGeometry')
+    links.new(shaft_transform.outputs['Geometry'], arrow.inputs['Geometry'])
+    links.new(head_transform.outputs['Geometry'], arrow.inputs['Geometry'])
+
+    # Each instance is turned towards its vector and scaled by its length
+    vector = nodes.new('GeometryNodeInputNamedAttribute')
+    vector.data_type = 'FLOAT_VECTOR'
+    vector.inputs['Name'].default_value = vector_attribute
+
+    align = nodes.new('FunctionNodeAlignEulerToVector')
+    align.axis = 'Z'
+    links.new(vector.outputs['Attribute'], align.inputs['Vector'])
+
+    length = nodes.new('ShaderNodeVectorMath')
+    length.operation = 'LENGTH'
+    links.new(vector.outputs['Attribute'], length.inputs[0])
+
+    scale = nodes.new('ShaderNodeMath')
+    scale.operation = 'MULTIPLY'
+    links.new(length.outputs['Value'], scale.inputs[0])
+    links.new(group_input.outputs['Scale'], scale.inputs[1])
+
+    instance = nodes.new('GeometryNodeInstanceOnPoints')
+    links.new(group_input.outputs['Geometry'], instance.inputs['Points'])
+    links.new(arrow.outputs['Geometry'], instance.inputs['Instance'])
+    links.new(align.outputs['Rotation'], instance.inputs['Rotation'])
+    links.new(scale.outputs['Value'], instance.inputs['Scale'])
+    links.new(instance.outputs['Instances'], group_output.inputs['Geometry'])
+
+    return group
+
+def get_arrow_group():
+    group = bpy.data.node_groups.get(arrow_group_name)
+    return group if group is not None else build_arrow_group()
+
+def attach_arrows(obj, arrow_scale):
+    modifier = obj.modifiers.new(name="Node Form Arrows", type='NODES')
+    modifier.node_group = get_arrow_group()
+    socket = next(item for item in modifier.node_group.interface.items_tree if item.item_type == 'SOCKET' and item.in_out == 'INPUT' and item.name == 'Scale')
+    modifier[socket.identifier] = float(arrow_scale)
+    return modifier
@@ -0,0 +1,272 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import math
+import hashlib
+import bpy
+import numpy as np
+
+# A Transform whose equations only use arithmetic and math functions is turned into a node group, so Blender
+# computes the positions of whichever frame is shown instead of the add-on baking every frame
+group_prefix = 'Node Form Transform '
+modifier_name = 'Node Form Transform'
+
+# The settings of one Transform, set on its modifier
+input_names = ('Start Frame', 'Run Time', 'Frames Per Second', 'Shrink', 'Smoothing')
+
+binary_operations = {'+': 'ADD', '-': 'SUBTRACT', '*': 'MULTIPLY', '/': 'DIVIDE', '**': 'POWER', '%': 'FLOORED_MODULO'}
+
+# (function, operation, numbers of arguments) for every function a Math node can compute, from math, numpy and
+# the builtins. None allows two or more arguments. LOG2, LOG10 and HYPOT take more than one node. round is left
+# out: it rounds halves to even and the Round node rounds them away from zero.
+function_operations = [
+    (math.sin, 'SINE', (1,)), (np.sin, 'SINE', (1,)),
+    (math.cos, 'COSINE', (1,)), (np.cos, 'COSINE', (1,)),
+    (math.tan, 'TANGENT', (1,)), (np.tan, 'TANGENT', (1,)),
+    (math.asin, 'ARCSINE', (1,)), (np.arcsin, 'ARCSINE', (1,)),
+    (math.acos, 'ARCCOSINE', (1,)), (np.arccos, 'ARCCOSINE', (1,)),
+    (math.atan, 'ARCTANGENT', (1,)), (np.arctan, 'ARCTANGENT', (1,)),
+    (math.atan2, 'ARCTAN2', (2,)), (np.arctan2, 'ARCTAN2', (2,)),
+    (math.sinh, 'SINH', (1,)), (np.sinh, 'SINH', (1,)),
+    (math.cosh, 'COSH', (1,)), (np.cosh, 'COSH', (1,)),
+    (math.tanh, 'TANH', (1,)), (np.tanh, 'TANH', (1,)),
+    (math.exp, 'EXPONENT', (1,)), (np.exp, 'EXPONENT', (1,)),
+    (math.log, 'LOGARITHM', (1, 2)), (np.log, 'LOGARITHM', (1,)),
+    (math.log2, 'LOG2', (1,)), (np.log2, 'LOG2', (1,)),
+    (math.log10, 'LOG10', (1,)), (np.log10, 'LOG10', (1,)),
+    (math.sqrt, 'SQRT', (1,)), (np.sqrt, 'SQRT', (1,)),
+    (math.pow, 'POWER', (2,)), (np.power, 'POWER', (2,)), (pow, 'POWER', (2,)),
+    (math.fabs, 'ABSOLUTE', (1,)), (np.fabs, 'ABSOLUTE', (1,)), (np.abs, 'ABSOLUTE', (1,)), (abs, 'ABSOLUTE', (1,)),
+    (math.fmod, 'MODULO', (2,)), (np.fmod, 'MODULO', (2,)),
+    (math.floor, 'FLOOR', (1,)), (np.floor, 'FLOOR', (1,)),
+    (math.ceil, 'CEIL', (1,)), (np.ceil, 'CEIL', (1,)),
+    (math.trunc, 'TRUNC', (1,)), (np.trunc, 'TRUNC', (1,)),
+    (math.degrees, 'DEGREES', (1,)), (np.degrees, 'DEGREES', (1,)),
+    (math.radians, 'RADIANS', (1,)), (np.radians, 'RADIANS', (1,)),
+    (math.hypot, 'HYPOT', (2,)), (np.hypot, 'HYPOT', (2,)),
+    (min, 'MINIMUM', None), (max, 'MAXIMUM', None),
+]
+
+def find_operation(function, argument_count):
+    for candidate, operation, counts in function_operations:
+        if candidate is function:
+            if (argument_count >= 2) if counts is None else (argument_count in counts):
+                return operation
+            return None
+    return None
+
+def math_operations(graph):
+    # The expression graph of the equations as Math node operations. Returns (operations, roots), where each
+    # operation is (operation, operands) and an operand or root is ('const', value), ('var', name) or
+    # ('op', position in operations). Returns None when an equation needs anything a Math node can't do, such
+    # as a function only Python has.
+    operations = []
+    values = {}
+
+    def emit(operation, *operands):
+        operations.append((operation, operands))
+        return ('op', len(operations) - 1)
+
+    for index in graph.ordered_nodes():
+        node = graph.nodes[index]
+        operands = [values.get(child) for child in graph.children(index)]
+
+        match node[0]:
+            case 'const':
+                if isinstance(node[1], complex):
+                    return None
+                values[index] = ('const', float(node[1]))
+            case 'var':
+                values[index] = ('var', node[1])
+            case 'global' | 'attr':
+                pass # Only usable as the function of a call
+            case 'binop':
+                if None in operands:
+                    return None
+                if node[1] == '//':
+                    values[index] = emit('FLOOR', emit('DIVIDE', *operands))
+                else:
+                    values[index] = emit(binary_operations[node[1]], *operands)
+            case 'unary':
+                if None in operands:
+                    return None
+                values[index] = emit('MULTIPLY', operands[0], ('const', -1.0)) if node[1] == '-' else operands[0]
+            case 'call':
+                arguments = [values.get(argument) for argument in node[2]]
+                operation = find_operation(graph.resolve(node[1]), len(arguments))
+                if operation is None or node[3] or None in arguments:
+                    return None
+                match operation:
+                    case 'MINIMUM' | 'MAXIMUM':
+                        value = arguments[0]
+                        for argument in arguments[1:]:
+                            value = emit(operation, value, argument)
+                    case 'LOGARITHM' if len(arguments) == 1:
+                        value = emit(operation, arguments[0], ('const', math.e))
+                    case 'LOG2' | 'LOG10':
+                        value = emit('LOGARITHM', arguments[0], ('const', 2.0 if operation == 'LOG2' else 10.0))
+                    case 'HYPOT':
+                        squares = [emit('MULTIPLY', argument, argument) for argument in arguments]
+                        value = emit('SQRT', emit('ADD', *squares))
+                    case _:
+                        value = emit(operation, *arguments)
+                values[index] = value
+            case _:
+                return None
+
+    roots = [values.get(root) for root in graph.roots]
+    if None in roots:
+        return None
+    return operations, roots
+
+def build_transform_group(name, operations, roots, variable_names):
+    group = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+    group.interface.new_socket('Geometry', in_out='INPUT', socket_type='NodeSocketGeometry')
+    for input_name in input_names:
+        group.interface.new_socket(input_name, in_out='INPUT', socket_type='NodeSocketFloat')
+    group.interface.new_socket('Geometry', in_out='OUTPUT', socket_type='NodeSocketGeometry')
+
+    nodes = group.nodes
+    links = group.links
+
+    def connect(value, socket):
+        if isinstance(value, float):
+            socket.default_value = value
+        else:
+            links.new(value, socket)
+
+    def math_node(operation, *operands, node_type='ShaderNodeMath', location=(0, 0)):
+        node = nodes.new(node_type)
+        node.operation = operation
+        node.location = location
+        for socket, operand in zip(node.inputs, operands):
+            connect(operand, socket)
+        return node.outputs[0]
+
+    group_input = nodes.new('NodeGroupInput')
+    group_input.location = (-800, 0)
+    group_output = nodes.new('NodeGroupOutput')
+    inputs = {input_name: group_input.outputs[input_name] for input_name in input_names}
+
+    # t is the time since the start frame, held between 0 and T like the keys of a baked Transform
+    scene_time = nodes.new('GeometryNodeInputSceneTime')
+    scene_time.location = (-800, 300)
+    frame = scene_time.outputs['Frame']
+    elapsed = math_node('DIVIDE', math_node('SUBTRACT', frame, inputs['Start Frame']), inputs['Frames Per Second'])
+    t = math_node('MAXIMUM', math_node('MINIMUM', elapsed, inputs['Run Time']), 0.0)
+
+    # SMOOTH and LINEAR runs evaluate the shrunken position and add back the remaining part of the original
+    remainder = math_node('MULTIPLY', inputs['Shrink'], math_node('SUBTRACT', 1.0, math_node('DIVIDE', t, inputs['Run Time'])))
+    position = nodes.new('GeometryNodeInputPosition').outputs['Position']
+    shrunk = nodes.new('ShaderNodeVectorMath')
+    shrunk.operation = 'SCALE'
+    links.new(position, shrunk.inputs[0])
+    connect(math_node('SUBTRACT', 1.0, remainder), shrunk.inputs['Scale'])
+    separate = nodes.new('ShaderNodeSeparateXYZ')
+    links.new(shrunk.outputs['Vector'], separate.inputs[0])
+
+    variables = {
+        variable_names['[x]']: separate.outputs['X'],
+        variable_names['[y]']: separate.outputs['Y'],
+        variable_names['[z]']: separate.outputs['Z'],
+        variable_names['[t]']: t,
+        variable_names['[T]']: inputs['Run Time'],
+    }
+
+    # Each operation goes one column right of the furthest operation it uses
+    results = []
+    columns = []
+    rows = {}
+
+    def operand(value):
+        match value[0]:
+            case 'const':
+                return value[1]
+            case 'var':
+                return variables[value[1]]
+            case 'op':
+                return results[value[1]]
+
+    for operation, operands in operations:
+        column = 1 + max([columns[value[1]] for value in operands if value[0] == 'op'], default=0)
+        row = rows.get(column, 0)
+        rows[column] = row + 1
+        columns.append(column)
+        results.append(math_node(operation, *map(operand, operands), location=(200 * column, -160 * row)))
+
+    width = 200 * (max(columns, default=0) + 1)
+    combine = nodes.new('ShaderNodeCombineXYZ')
+    combine.location = (width, 300)
+    for socket, root in zip(combine.inputs, roots):
+        connect(operand(root), socket)
+
+    kept = nodes.new('ShaderNodeVectorMath')
+    kept.operation = 'SCALE'
+    links.new(position, kept.inputs[0])
+    connect(math_node('MULTIPLY', remainder, inputs['Smoothing']), kept.inputs['Scale'])
+    moved = math_node('ADD', combine.outputs['Vector'], kept.outputs['Vector'], node_type='ShaderNodeVectorMath', location=(width + 200, 300))
+
+    # Before its start frame the object is left as it comes, so it can first play what came before
+    started = nodes.new('FunctionNodeCompare')
+    started.data_type = 'FLOAT'
+    started.operation = 'GREATER_EQUAL'
+    links.new(frame, started.inputs[0])
+    links.new(inputs['Start Frame'], started.inputs[1])
+
+    set_position = nodes.new('GeometryNodeSetPosition')
+    set_position.location = (width + 400, 0)
+    links.new(group_input.outputs['Geometry'], set_position.inputs['Geometry'])
+    links.new(started.outputs['Result'], set_position.inputs['Selection'])
+    links.new(moved, set_position.inputs['Position'])
+    links.new(set_position.outputs['Geometry'], group_output.inputs['Geometry'])
+    group_output.location = (width + 600, 0)
+
+    return group
+
+def get_transform_group(graph, variable_names):
+    # One group per translation, shared by every object it transforms. The name is a hash of the operations
+    # themselves, which hold the constants folded from imported modules, so editing a module or a dictionary
+    # builds a new group instead of reusing one made from different values.
+    # Returns None when the equations can't be expressed with Math nodes.
+    translated = math_operations(graph)
+    if translated is None:
+        return None
+    name = group_prefix + hashlib.sha1(repr(translated).encode()).hexdigest()[:12]
+    group = bpy.data.node_groups.get(name)
+    if group is not None:
+        return group
+    return build_transform_group(name, *translated, variable_names)
+
+def modifier_inputs(modifier):
+    return {item.name: item.identifier for item in modifier.node_group.interface.items_tree if item.item_type == 'SOCKET' and item.in_out == 'INPUT' and item.name in input_names}
+
+def attach_transform(obj, group, settings):
+    modifier = obj.modifiers.new(name=modifier_name, type='NODES')
+    modifier.node_group = group
+    for input_name, identifier in modifier_inputs(modifier).items():
+        modifier[identifier] = float(settings[input_name])
+    return modifier
+
+def transform_end_frame(obj):
+    # The frame the last node group Transform on obj finishes, so one that follows starts from there
+    end_frame = 0.0
+    for modifier in obj.modifiers:
+        if modifier.type == 'NODES' and modifier.node_group and modifier.node_group.name.startswith(group_prefix):
+            settings = {input_name: modifier[identifier] for input_name, identifier in modifier_inputs(modifier).items()}
+            end_frame = max(end_frame, settings['Start Frame'] + settings['Run Time'] * settings['Frames Per Second'])
+    return end_frame
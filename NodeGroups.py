@@ -17,10 +17,11 @@
 # the [Blender Foundation](https://www.blender.org/).
 
 import os
+import time
 import importlib.util
 import bpy
 from bpy.types import Node, GeometryNodeTree, Operator, Menu, PropertyGroup, Scene
-from bpy.props import StringProperty, BoolProperty, EnumProperty, CollectionProperty, IntProperty
+from bpy.props import StringProperty, BoolProperty, EnumProperty, CollectionProperty, IntProperty, FloatProperty
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -55,6 +56,10 @@ class NODE_FORM_GNT_Node_Form_Tree(GeometryNodeTree):
     def poll(cls, ntree):
         return hasattr(ntree, 'bl_idname') and ntree.bl_idname == "node_form.node_form_tree"
 
+    def update(self):
+        # Called when nodes or links change, the next run compiles a new plan
+        ns.npl.invalidate_plan(self)
+
 
 class NODE_FORM_NT_Start_Node(Node):
     bl_idname = 'node_form.start_node'
@@ -63,12 +68,26 @@ class NODE_FORM_NT_Start_Node(Node):
 
     automation_type: StringProperty(default='SRT')
 
+    use_cache: BoolProperty(default=True, description="Skip Grid and Transform nodes whose inputs have not changed since the last run")
+    is_concurrent: BoolProperty(default=False, description="Calculate the grids and frames of independent branches at the same time on worker threads")
+    is_profiled: BoolProperty(default=False, description="Run every node under cProfile and write a timeline of the run (slower)")
+    profile_directory: StringProperty(default='//node_form_profile/', subtype='DIR_PATH')
+
+    run_report: StringProperty()
+
     def init(self, context):
         self.outputs.new('NodeSocketVirtual', "Any")
         self.inputs.new('NodeSocketVirtual', "Library/Dictionary")
 
     def draw_buttons(self, context, layout):
         layout.operator("node_form.start_button", text="Run All Paths")
+        layout.prop(self, 'use_cache', text="Reuse Unchanged Nodes")
+        layout.prop(self, 'is_concurrent', text="Concurrent Branches")
+        layout.prop(self, 'is_profiled', text="Profile")
+        if self.is_profiled:
+            layout.prop(self, 'profile_directory', text='')
+        for line in ns.npf.summary_lines(self.run_report):
+            layout.label(text=line)
         layout.menu('NODE_FORM_MT_start_node_menu', text='Add Node')
         layout.menu('NODE_FORM_MT_start_node_preset_menu', text='Choose Preset')
 
@@ -145,6 +164,39 @@ class NODE_FORM_NT_Grid_Create_Node(Node):
 
     is_hollow: BoolProperty(default=False)
 
+    domain: EnumProperty(
+        name="Domain",
+        items=[
+            ('VOLUME', "Volume", "Every cell of the lattice"),
+            ('SHELL', "Shell", "Only the outer surface of the lattice"),
+            ('SHEET', "Sheet", "A single layer perpendicular to the chosen axis, placed at its offset"),
+            ('CURVE', "Curve", "A single line of points along the chosen axis"),
+        ],
+        default='VOLUME'
+    )
+
+    domain_axis: EnumProperty(
+        name="Axis",
+        items=[
+            ('X', "X", ""),
+            ('Y', "Y", ""),
+            ('Z', "Z", ""),
+        ],
+        default='Z'
+    )
+
+    is_refined: BoolProperty(default=False, description="Subdivide the lattice where the following Transform bends it the most")
+    refine_tolerance: FloatProperty(default=0.01, min=0.0, precision=4, description="Largest distance the transformed lattice may stray from a straight edge")
+
+    is_vector_field: BoolProperty(default=False, description="Keep only the points and draw an arrow at each one")
+    x_vector: StringProperty(default='0')
+    y_vector: StringProperty(default='0')
+    z_vector: StringProperty(default='1')
+    is_normalized: BoolProperty(default=False, description="Give every arrow the same length")
+    arrow_scale: FloatProperty(default=0.1, min=0.0, description="Length of an arrow for a vector of length one")
+
+    cache_record: StringProperty()
+
     def init(self, context):
         self.outputs.new('NodeSocketVirtual', "")
         self.inputs.new('NodeSocketVirtual', "")
@@ -169,7 +221,28 @@ class NODE_FORM_NT_Grid_Create_Node(Node):
         row.prop(self, 'cube_density_y', text='')
         row.prop(self, 'cube_density_z', text='')
         row=layout.row()
-        row.prop(self, 'is_hollow', text='Hollow')
+        if self.is_hollow:
+            row.prop(self, 'is_hollow', text='Hollow')
+        else:
+            row.prop(self, 'domain', text='')
+            if self.domain in ('SHEET', 'CURVE'):
+                row.prop(self, 'domain_axis', expand=True)
+        row=layout.row()
+        row.prop(self, 'is_refined', text='Refine')
+        if self.is_refined:
+            row.prop(self, 'refine_tolerance', text='Tolerance')
+        row=layout.row()
+        row.prop(self, 'is_vector_field', text='Vector Field')
+        if self.is_vector_field:
+            row.prop(self, 'is_normalized', text='Normalized')
+            row = layout.row()
+            row.prop(self, 'x_vector', text='X(x,y,z) = ')
+            row = layout.row()
+            row.prop(self, 'y_vector', text='Y(x,y,z) = ')
+            row = layout.row()
+            row.prop(self, 'z_vector', text='Z(x,y,z) = ')
+            row = layout.row()
+            row.prop(self, 'arrow_scale', text='Arrow Scale')
 
 class NODE_FORM_NT_Transform_Node(Node):
 
@@ -209,6 +282,29 @@ class NODE_FORM_NT_Transform_Node(Node):
             ],
             default='DELETE'
         )
+
+    is_parallel: BoolProperty(default=False, description="Evaluate the frames in worker processes")
+
+    output_mode: EnumProperty(
+            name="Output Mode",
+            description="Choose an option",
+            items=[
+                ('SHAPE_KEYS', "Shape Keys", "Every calculated frame is stored as a shape key inside the .blend file"),
+                ('PC2', "Point Cache (PC2)", "Frames are streamed to a .pc2 file which a Mesh Cache modifier plays back from disk"),
+                ('NPY', "NumPy Array (.npy)", "Frames are exported to a (frames, vertices, 3) .npy file for post-processing, the object itself is not animated"),
+                ('LIVE', "Live", "Nothing is baked, each frame is calculated when it is shown and recent frames are kept for scrubbing"),
+                ('GEOMETRY_NODES', "Geometry Nodes", "The equations become a node group on a Geometry Nodes modifier which Blender evaluates every frame. Equations calling functions only Python has are baked to shape keys instead"),
+            ],
+            default='SHAPE_KEYS'
+        )
+
+    cache_directory: StringProperty(default='//node_form_cache/', subtype='DIR_PATH')
+    live_cache_frames: IntProperty(default=64, min=1)
+    is_adaptive: BoolProperty(default=False, description="Only keep the frames that linear interpolation between neighbouring keys cannot reproduce")
+    adaptive_tolerance: FloatProperty(default=0.001, min=0.0, precision=4, description="Largest distance a vertex may be from its calculated position")
+    is_batched: BoolProperty(default=False, description="Evaluate every frame once for all selected meshes together instead of one mesh at a time")
+
+    cache_record: StringProperty()
     
     def init(self, context):
         self.outputs.new('NodeSocketVirtual', "")
@@ -234,6 +330,22 @@ class NODE_FORM_NT_Transform_Node(Node):
         row = layout.row()
         row.prop(self, "keep_option", text='')
         row.prop(self, "transformation_type", text='')
+        row = layout.row()
+        row.prop(self, "is_parallel", text='Parallel Frames')
+        row.prop(self, "output_mode", text='')
+        if self.output_mode in ['PC2', 'NPY']:
+            row = layout.row()
+            row.prop(self, "cache_directory", text='Cache Folder')
+        elif self.output_mode == 'LIVE':
+            row = layout.row()
+            row.prop(self, "live_cache_frames", text='Cached Frames')
+        elif self.output_mode == 'SHAPE_KEYS':
+            row = layout.row()
+            row.prop(self, "is_adaptive", text='Adaptive Keys')
+            if self.is_adaptive:
+                row.prop(self, "adaptive_tolerance", text='Tolerance')
+            row = layout.row()
+            row.prop(self, "is_batched", text='Batch Objects')
 
 class NODE_FORM_NT_Dictionary_Node(Node):
 
@@ -469,34 +581,111 @@ class NODE_FORM_OT_Create_Execute_Node(Operator):
 class NODE_FORM_OT_Start_Button(Operator):
     bl_idname = "node_form.start_button"
     bl_label = "Start Button"
-    
-    def execute(self, context):
+    bl_options = {'REGISTER', 'UNDO'} # The whole run is one undo step
+
+    # Seconds of work between two redraws when running from the button
+    time_slice = 0.1
+
+    # While a run holds objects, meshes and shape keys between slices, only the view can be moved. Anything else,
+    # such as undo, deleting or opening a file, would change the data from under it.
+    navigation_events = {
+        'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE',
+        'TRACKPADPAN', 'TRACKPADZOOM', 'MOUSEROTATE', 'MOUSESMARTZOOM', 'NDOF_MOTION',
+    }
+
+    def find_start_node(self):
 
         setattr(bpy.context.scene, 'replacement_dictionary_is_updated', True)
 
         node_form_object = bpy.data.objects.get('Node Form')
 
-        node_form_object.hide_viewport = True
+        if node_form_object is not None:
+            node_form_object.hide_viewport = True
         
         node_tree = bpy.data.node_groups.get('Node Form')
         
         if node_tree is None:
             print("Node tree 'Node Form' not found.")
-            return {'CANCELLED'}
+            return None
 
         start_node = next((node for node in node_tree.nodes if node.name == 'Start'), None)
 
         if start_node is None:
             print("Node 'Start Node' not found in 'Node Form'.")
+            return None
+
+        return start_node
+
+    def finish(self, context):
+        node_form_object = bpy.data.objects.get('Node Form')
+        if node_form_object is not None:
+            node_form_object.hide_viewport = True
+            bpy.context.view_layer.objects.active = node_form_object
+
+    def execute(self, context):
+        # Runs the whole tree at once, as scripts calling the operator expect
+        start_node = self.find_start_node()
+        if start_node is None:
             return {'CANCELLED'}
 
         ns.execute_all_paths(start_node)
 
-        node_form_object.hide_viewport = True
-        bpy.context.view_layer.objects.active = node_form_object
-
+        self.finish(context)
         return {'FINISHED'}
 
+    def invoke(self, context, event):
+        # From the button the tree runs a slice at a time between redraws, with progress, and Esc stops it
+        start_node = self.find_start_node()
+        if start_node is None:
+            return {'CANCELLED'}
+
+        self.steps = ns.execute_all_paths_steps(start_node)
+        window_manager = context.window_manager
+        self.timer = window_manager.event_timer_add(0.01, window=context.window)
+        window_manager.progress_begin(0, 1000)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+
+        if event.type == 'ESC':
+            # The node that was running removes what it had not finished, finished nodes stay
+            self.steps.close()
+            self.end_modal(context)
+            self.report({'WARNING'}, "Node Form run cancelled")
+            return {'CANCELLED'}
+
+        if event.type in self.navigation_events:
+            return {'PASS_THROUGH'}
+
+        if event.type != 'TIMER':
+            return {'RUNNING_MODAL'}
+
+        deadline = time.perf_counter() + self.time_slice
+        try:
+            progress = None
+            while time.perf_counter() < deadline:
+                progress = next(self.steps)
+        except StopIteration:
+            self.end_modal(context)
+            return {'FINISHED'}
+        except Exception:
+            self.steps.close()
+            self.end_modal(context)
+            raise
+
+        if progress is not None:
+            context.window_manager.progress_update(int(progress.fraction() * 1000))
+            context.workspace.status_text_set(progress.status())
+        return {'RUNNING_MODAL'}
+
+    def end_modal(self, context):
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self.timer)
+        window_manager.progress_end()
+        context.workspace.status_text_set(None)
+        self.finish(context)
+
 class NODE_FORM_OT_Folder_Node_Down_Button(Operator):
 
     bl_label = "Dictionary Node Down Button"
@@ -574,7 +763,10 @@ class NODE_FORM_OT_Create_Spherical_Preset(Operator):
             
             grid_create_node = node_tree.nodes.new('node_form.grid_create_node')
             grid_create_node.location = (400, 100)
-            grid_create_node.x_length = '1'
+            # The sphere is the sheet of constant radius, instead of a ball of nested spheres
+            grid_create_node.domain = 'SHEET'
+            grid_create_node.domain_axis = 'X'
+            grid_create_node.x_offset = '1'
             grid_create_node.y_length = '2*[pi]'
             grid_create_node.z_length = '[pi]'
 
@@ -614,7 +806,9 @@ class NODE_FORM_OT_Create_Smooth_Spherical_Preset(Operator):
             
             grid_create_node = node_tree.nodes.new('node_form.grid_create_node')
             grid_create_node.location = (300, 100)
-            grid_create_node.x_length = '1'
+            grid_create_node.domain = 'SHEET'
+            grid_create_node.domain_axis = 'X'
+            grid_create_node.x_offset = '1'
             grid_create_node.y_length = '2*[pi]'
             grid_create_node.y_offset = '-[pi]'
             grid_create_node.z_length = '[pi]'
@@ -626,7 +820,7 @@ class NODE_FORM_OT_Create_Smooth_Spherical_Preset(Operator):
             transform_node.y_equation = "[r]*sin(φ)*cos(θ)"
             transform_node.z_equation = "[r]*sin(θ)"
             transform_node.transformation_type = 'SMOOTH'
-            transform_node.animation_runtime = '2'
+            transform_node.animation_run_time = '2'
 
             node_tree.links.new(grid_create_node.outputs[0], transform_node.inputs[0])
             node_tree.links.new(dictionary_node.outputs[0], start_node.inputs[0])
@@ -655,7 +849,10 @@ class NODE_FORM_OT_Create_Cylindrical_Preset(Operator):
             
             grid_create_node = node_tree.nodes.new('node_form.grid_create_node')
             grid_create_node.location = (300, 100)
-            grid_create_node.x_length = '1'
+            # The cylinder is the sheet of constant radius
+            grid_create_node.domain = 'SHEET'
+            grid_create_node.domain_axis = 'X'
+            grid_create_node.x_offset = '1'
             grid_create_node.y_length = '2*[pi]'
             grid_create_node.y_offset = '-[pi]'
             grid_create_node.z_length = '1'
@@ -746,12 +943,18 @@ registrars = [
 def register_ng():
     for nodeclass in registrars:
         bpy.utils.register_class(nodeclass)
+    ns.nm.nl.register_live_handler()
     Scene.replacement_dictionary = CollectionProperty(type=NODE_FORM_PG_Dictionary_Property_Group)
     Scene.replacement_dictionary_is_updated = BoolProperty(default=True) #This is the parent object. context.scene is the instance running in the blender folder
     Scene.library_collection = CollectionProperty(type=NODE_FORM_PG_Library_Property_Group)
     Scene.filepath_collection = CollectionProperty(type=NODE_FORM_PG_Filepath_Property_Group)
 
 def unregister_ng():
+    ns.nm.npr.shutdown_pool()
+    ns.nsc.shutdown_executor()
+    ns.nm.ne.clear_file_modules()
+    ns.nm.nb.clear_buffers()
+    ns.nm.nl.unregister_live_handler()
     for nodeclass in registrars:
         bpy.utils.unregister_class(nodeclass)
     del Scene.replacement_dictionary
@@ -0,0 +1,151 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import numpy as np
+
+# The axes spanning the faces that are perpendicular to each axis, in the order that makes the face normal point along it
+face_axes = ((1, 2), (2, 0), (0, 1))
+
+def lattice_shape(cuts):
+    # An axis without cuts collapses onto a single layer of points
+    return tuple(int(cut) + 1 if cut > 0 else 1 for cut in cuts)
+
+def lattice_axes(lengths, offset, cuts):
+    # The coordinates of the lattice layers along each axis
+    shape = lattice_shape(cuts)
+    return [offset[d] + np.arange(shape[d]) * (lengths[d] / cuts[d] if cuts[d] > 0 else 0.0) for d in range(3)]
+
+def axes_shape(axes):
+    return tuple(len(axis) for axis in axes)
+
+def lattice_indices(shape):
+    # Vertex index of every lattice point, addressed as [i, j, k] with x varying fastest
+    return np.arange(shape[0] * shape[1] * shape[2], dtype=np.int32).reshape(shape[2], shape[1], shape[0]).transpose(2, 1, 0)
+
+def lattice_vertices(axes):
+    z, y, x = np.meshgrid(axes[2], axes[1], axes[0], indexing='ij')
+    return np.stack((x.ravel(), y.ravel(), z.ravel()), axis=1).astype(np.float32)
+
+def lattice_edges(shape, indices):
+    edges = []
+    for d in range(3):
+        if shape[d] > 1:
+            lower = np.take(indices, range(shape[d] - 1), axis=d)
+            upper = np.take(indices, range(1, shape[d]), axis=d)
+            edges.append(np.stack((lower.ravel(), upper.ravel()), axis=1))
+    return np.concatenate(edges).astype(np.int32) if edges else np.empty((0, 2), dtype=np.int32)
+
+def plane_indices(shape, d, layer):
+    # Vertex indices of one lattice layer perpendicular to axis d, over the remaining axes in ascending order
+    ranges = [np.arange(shape[axis], dtype=np.int64) for axis in range(3)]
+    ranges[d] = np.array([layer], dtype=np.int64)
+    indices = ranges[0][:, None, None] + ranges[1][None, :, None] * shape[0] + ranges[2][None, None, :] * shape[0] * shape[1]
+    return indices.squeeze(axis=d)
+
+def plane_quads(shape, d, layer):
+    # Faces on the lower boundary are reversed so that the faces of the outer shell all point outwards
+    b, c = face_axes[d]
+    plane = plane_indices(shape, d, layer)
+    if b > c:
+        plane = plane.T
+    quads = np.stack((plane[:-1, :-1], plane[1:, :-1], plane[1:, 1:], plane[:-1, 1:]), axis=-1).reshape(-1, 4)
+    return quads[:, ::-1] if layer == 0 and shape[d] > 1 else quads
+
+def lattice_faces(shape, boundary_only=False):
+    # Quads of every lattice layer perpendicular to each axis, or of the outermost layers only
+    faces = []
+    for d in range(3):
+        b, c = face_axes[d]
+        if shape[b] < 2 or shape[c] < 2:
+            continue
+        layers = sorted({0, shape[d] - 1}) if boundary_only else range(shape[d])
+        faces.extend(plane_quads(shape, d, layer) for layer in layers)
+    return np.concatenate(faces) if faces else np.empty((0, 4), dtype=np.int64)
+
+def face_edges(faces):
+    edges = np.stack((faces, np.roll(faces, -1, axis=1)), axis=-1).reshape(-1, 2)
+    return np.unique(np.sort(edges, axis=1), axis=0)
+
+def lattice(axes):
+    # The cube lattice the Grid Create node makes: every lattice point, every lattice segment, and one quad per
+    # cell side, with the sides shared by neighbouring cells stored once
+    shape = axes_shape(axes)
+    indices = lattice_indices(shape)
+    return lattice_vertices(axes), lattice_edges(shape, indices), lattice_faces(shape).astype(np.int32)
+
+def shell(axes):
+    # Only the outer surface of the lattice. The points are gathered from the six boundary layers, so the work
+    # grows with the surface and not the volume.
+    shape = axes_shape(axes)
+    if min(shape) < 2:
+        return lattice(axes)
+
+    faces = lattice_faces(shape, boundary_only=True)
+    used, faces = np.unique(faces, return_inverse=True)
+    faces = faces.reshape(-1, 4).astype(np.int32)
+
+    points = (used % shape[0], used // shape[0] % shape[1], used // (shape[0] * shape[1]))
+    vertices = np.stack([np.asarray(axes[d])[points[d]] for d in range(3)], axis=1).astype(np.float32)
+    return vertices, face_edges(faces).astype(np.int32), faces
+
+def domain_cuts(cuts, domain, domain_axis):
+    # A sheet drops the cuts along its normal axis, a curve keeps only the cuts along its own axis
+    axis = 'XYZ'.index(domain_axis)
+    match domain:
+        case 'SHEET':
+            return tuple(0 if d == axis else cuts[d] for d in range(3))
+        case 'CURVE':
+            return tuple(cuts[d] if d == axis else 0 for d in range(3))
+    return tuple(cuts)
+
+def domain_axes(lengths, offset, cuts, domain='VOLUME', domain_axis='Z'):
+    return lattice_axes(lengths, offset, domain_cuts(cuts, domain, domain_axis))
+
+def domain_mesh(axes, domain='VOLUME'):
+    if domain == 'SHELL':
+        return shell(axes)
+    return lattice(axes)
+
+def interval_errors(values, shape, d):
+    # How far the mapped lattice bends within each interval along axis d. The second difference of the mapped
+    # points is the change of the finite difference Jacobian column between neighbouring cells, and a curve
+    # bending by that much strays about an eighth of it from the straight segment between two lattice points.
+    if shape[d] < 3:
+        return np.zeros(max(shape[d] - 1, 0))
+    values = np.moveaxis(values.reshape(shape[2], shape[1], shape[0], -1).transpose(2, 1, 0, 3), d, 0)
+    bending = np.linalg.norm(values[2:] - 2 * values[1:-1] + values[:-2], axis=-1)
+    bending = np.nan_to_num(bending.reshape(shape[d] - 2, -1).max(axis=1), nan=0.0, posinf=0.0) / 8
+    # Each interval takes the larger bend of its two end points
+    node_errors = np.concatenate(([bending[0]], bending, [bending[-1]]))
+    return np.maximum(node_errors[:-1], node_errors[1:])
+
+def refine_axes(axes, values, tolerance, max_subdivisions=8):
+    # Splits the intervals of each axis whose bend is above the tolerance, more finely the more they bend.
+    # Whole layers are inserted, so the refined lattice stays a lattice with the same kind of topology.
+    shape = axes_shape(axes)
+    refined = []
+    for d in range(3):
+        axis = np.asarray(axes[d], dtype=np.float64)
+        if len(axis) < 2 or tolerance <= 0:
+            refined.append(axis)
+            continue
+        # The bend of a segment shrinks with the square of its length
+        subdivisions = np.clip(np.ceil(np.sqrt(interval_errors(values, shape, d) / tolerance)), 1, max_subdivisions).astype(int)
+        layers = [np.linspace(axis[i], axis[i + 1], subdivisions[i], endpoint=False) for i in range(len(axis) - 1)]
+        refined.append(np.concatenate(layers + [axis[-1:]]))
+    return refined
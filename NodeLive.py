@@ -0,0 +1,125 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import bpy
+import numpy as np
+from collections import OrderedDict
+from bpy.app.handlers import persistent
+
+# Set by NodeMechanics to its own NodeEvaluation, so live playback shares its imported files and counters
+ne = None
+
+# Everything needed to rebuild a live transform is stored on its object, so it keeps working after a reload
+live_property = 'node_form_live'
+basis_attribute = 'node_form_basis'
+
+# Object session_uid -> LiveTransform, so renaming keeps it. Rebuilt from the object on first use after a file is loaded.
+live_transforms = {}
+
+# Set by NodeMechanics, returns the EvaluationContext used to compile equations of live objects after a reload
+context_factory = None
+
+class LiveTransform:
+
+    # Evaluates one object's equations for whichever frame is shown, keeping the last few frames for scrubbing
+    def __init__(self, evaluation_context, equations, basis, settings):
+        self.vector_kernel = evaluation_context.vector_kernel(equations)
+        self.basis = basis
+        self.settings = settings
+        self.frames = OrderedDict()
+        self.scratch = np.empty(basis.shape, dtype=np.float64)
+
+    def frame_parameters(self, frame):
+        settings = self.settings
+        run_frames = settings['upper_range'] * settings['frame_divisor']
+        elapsed = min(max(frame - settings['start_frame'], 0.0), run_frames)
+        t = elapsed / settings['frames_per_second']
+        T = run_frames / settings['frames_per_second']
+        remainder = 0 if settings['is_instantaneous'] or T == 0 else 1 - t / T
+        return remainder, settings['smoothing_constant'], t, T
+
+    def get_frame(self, frame):
+        coordinates = self.frames.get(frame)
+        if coordinates is not None:
+            self.frames.move_to_end(frame)
+            return coordinates
+
+        remainder, smoothing_constant, t, T = self.frame_parameters(frame)
+        if len(self.frames) >= self.settings['cache_frames']:
+            # Reuse the array of the least recently shown frame
+            coordinates = self.frames.popitem(last=False)[1]
+        else:
+            coordinates = np.empty(self.basis.shape, dtype=np.float32)
+        coordinates = ne.evaluate_frame(self.vector_kernel, self.basis, remainder, smoothing_constant, t, T, coordinates, self.scratch)
+        self.frames[frame] = coordinates
+        return coordinates
+
+def make_live(obj, evaluation_context, equations, basis, settings):
+    # The object's own shape keys would override written vertex positions, so the basis moves to an attribute.
+    # The basis is the key the Transform starts from; objects with other keys are baked instead, see transform().
+    obj.shape_key_clear()
+    mesh = obj.data
+    if basis_attribute in mesh.attributes:
+        mesh.attributes.remove(mesh.attributes[basis_attribute])
+    mesh.attributes.new(basis_attribute, 'FLOAT_VECTOR', 'POINT').data.foreach_set('vector', basis.astype(np.float32).ravel())
+
+    obj[live_property] = dict(settings, equations=list(equations))
+
+    live_transforms[obj.session_uid] = LiveTransform(evaluation_context, equations, np.array(basis, dtype=np.float64), settings)
+    update_object(obj, bpy.context.scene.frame_current)
+
+def load_live(obj):
+    settings = dict(obj[live_property].to_dict())
+    equations = settings.pop('equations')
+    attribute = obj.data.attributes.get(basis_attribute)
+    if attribute is None or context_factory is None:
+        return None
+    basis = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    attribute.data.foreach_get('vector', basis)
+    live_transforms[obj.session_uid] = LiveTransform(context_factory(), equations, basis.reshape(-1, 3).astype(np.float64), settings)
+    return live_transforms[obj.session_uid]
+
+def update_object(obj, frame):
+    live_transform = live_transforms.get(obj.session_uid) or load_live(obj)
+    if live_transform is None or len(live_transform.basis) != len(obj.data.vertices):
+        return
+    coordinates = live_transform.get_frame(float(frame))
+    obj.data.vertices.foreach_set('co', coordinates.ravel())
+    obj.data.update()
+
+@persistent
+def live_frame_change(scene, depsgraph=None):
+    frame = scene.frame_current + scene.frame_subframe
+    for obj in scene.objects:
+        if live_property in obj and obj.type == 'MESH':
+            update_object(obj, frame)
+
+@persistent
+def clear_live_transforms(dummy):
+    live_transforms.clear()
+
+def register_live_handler():
+    bpy.app.handlers.frame_change_pre.append(live_frame_change)
+    bpy.app.handlers.load_pre.append(clear_live_transforms)
+
+def unregister_live_handler():
+    if live_frame_change in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(live_frame_change)
+    if clear_live_transforms in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(clear_live_transforms)
+    live_transforms.clear()
@@ -16,80 +16,148 @@
 # This add-on is built upon Blender's open-source codebase. Special thanks to
 # the [Blender Foundation](https://www.blender.org/).
 
+import os
+import sys
 import bpy
-import bmesh
-import mathutils
 import math
-import importlib
-
-# is_vector_field : destroy all but vertices, 
-# add three evaluations, 
-# add vectors at those points
-# make a normalized check box 
-# (and remove hollow)
-def grid(lengths_vector, offset_vector, density_vector): 
-    # Store current selection
-    current_selection = [obj for obj in bpy.context.selected_objects]
-
-    # Deselect all objects
-    bpy.ops.object.select_all(action='DESELECT')
-
-    bm = bmesh.new()
-    bmesh.ops.create_cube(bm, size=1.0)
-    bmesh.ops.translate(bm, verts=list(bm.verts), vec=math_return_vector(1 / 2, 1 / 2, 1 / 2))
-    math_flatten_bmesh(bm, lengths_vector)
-    xCuts = math.floor(density_vector[0] * abs(lengths_vector[0]))
-    yCuts = math.floor(density_vector[1] * abs(lengths_vector[1]))
-    zCuts = math.floor(density_vector[2] * abs(lengths_vector[2]))
-    xScale = abs(1 / xCuts if xCuts != 0 else 0)
-    yScale = abs(1 / yCuts if yCuts != 0 else 0)
-    zScale = abs(1 / zCuts if zCuts != 0 else 0)
-    iterationsVector = mathutils.Vector((xCuts, yCuts, zCuts))
-    scaleVector = mathutils.Vector((xScale, yScale, zScale))
-    math_flatten_bmesh(bm, scaleVector)
-    math_translate_bmesh(bm, offset_vector)
-    bm_now = bm
-    created_objects = []  # New array to store created objects
-    for d in range(3):
-        for i in range(int(iterationsVector[d]) - 1):
-            bm_temp = bm_now.copy()
-            bm_copy = bm_now.copy()
-            obj = bmesh_embody_mesh(bm_temp)
-            created_objects.append(obj)  # Add created object to the array
-            translater = mathutils.Vector((0, 0, 0))
-            translater[d] = lengths_vector[d] * scaleVector[d]
-            math_translate_bmesh(bm_copy, translater)
-            bm_now = bm_copy
-        obj = bmesh_embody_mesh(bm_now)
-        created_objects.append(obj)  # Add created object to the array
-        bpy_join_all(created_objects)  # Pass the array to the joinAll function
-        created_objects.clear()  # Clear the array after joinAll function
-        bm_now = bmesh_selection_to_bmesh(bpy.context.active_object)
-
-    # Restore original selection
-    for obj in current_selection:
-        obj.select_set(True)
+import importlib.util
+import numpy as np
+from contextlib import contextmanager
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the path to the module you want to import
+module_name = "NodeCore"  # Name of the module you want to import
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+# Load the module
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nco = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nco)
+
+# The core's own evaluation and lattice modules, so there is one of each
+ne = nco.ne
+nlt = nco.nlt
+
+module_name = "NodeBuffers"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nb = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nb)
+
+module_name = "NodeAnimation"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+na = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(na)
+
+module_name = "NodeCache"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nc = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nc)
+
+module_name = "NodeLive"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nl = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nl)
+
+module_name = "NodeField"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nf = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nf)
+
+module_name = "NodeGeometry"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+ngm = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ngm)
+
+module_name = "NodeProfile"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+npf = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(npf)
+
+module_name = "NodeParallel"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
 
-def hollow_grid(offset, dimension, density_vector):
-    dimension_vector = math_return_vector(dimension[0], dimension[1], dimension[2])
-    offset_vector = math_return_vector(offset[0], offset[1], offset[2])
-    obj = bpy.context.active_object
-    bm = bmesh_selection_to_bmesh(obj)
+# Registered by name so its functions can be sent to the worker processes
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+npr = importlib.util.module_from_spec(spec)
+sys.modules[module_name] = npr
+spec.loader.exec_module(npr)
 
-    # Summing the densities multiplied by the dimensions gauruntees that it is smaller than one cube, multiplying it by 1/2 makes sure that it is before the center of the inside face
-    nudgeVector = math_scale_vector(dimension, 0.5 / (1 + (density_vector[0] + density_vector[1] + density_vector[2]) * (dimension[0] + dimension[1] + dimension[2])))
+# The evaluation context of the current run, rebuilt whenever the libraries and file imports are
+evaluation_context = None
 
-    bmesh_select_geometry(bm, offset_vector + nudgeVector, dimension_vector + offset_vector - nudgeVector)
-    bmesh.ops.delete(bm, geom=[f for f in bm.faces if f.select], context='FACES')
-    bm.to_mesh(obj.data)
-    bm.free()
+def grid(lengths_vector, offset_vector, density_vector, domain='VOLUME', domain_axis='Z', refine_equations=None, refine_tolerance=0.01, refine_run_time=0.0, vector_equations=None, is_normalized=False, arrow_scale=0.1): 
+    grid_object(grid_arrays(lengths_vector, offset_vector, density_vector, domain, domain_axis, refine_equations, refine_tolerance, refine_run_time, vector_equations, is_normalized), arrow_scale)
 
-def transform(equations_vector, animation_run_time, frames_per_calculation, repeats, transformation_type, keep_option):
+def grid_arrays(*arguments):
+    # Everything about a grid that does not touch bpy, so it can also be calculated on a worker thread
+    return nco.grid_arrays(get_evaluation_context(), *arguments)
 
-    print(equations_vector)
+def grid_object(arrays, arrow_scale=0.1):
+    vertices, edges, faces, vectors = arrays
+
+    mesh = bpy.data.meshes.new("Mesh")
+    nb.fill_mesh(mesh, vertices, edges, faces)
+    npf.add('vertices', len(vertices))
+    obj = bpy.data.objects.new("Mesh", mesh)
+    bpy.context.collection.objects.link(obj)
+
+    if vectors is not None:
+        nf.write_vectors(mesh, vectors)
+        nf.attach_arrows(obj, arrow_scale)
+    # Added to the current selection and made active
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+
+def transform(*arguments, **keywords):
+    for _ in transform_steps(*arguments, **keywords):
+        pass
+
+def transform_steps(equations_vector, animation_run_time, frames_per_calculation, repeats, transformation_type, keep_option, is_parallel=False, output_mode='SHAPE_KEYS', cache_directory='//', live_cache_frames=64, is_adaptive=False, adaptive_tolerance=0.001, is_batched=False, prefetched=None):
+
+    # Yields the vertex count of the object after every frame it writes, so a caller can stop between frames
+
+    if output_mode == 'GEOMETRY_NODES':
+        transform_group = ngm.get_transform_group(get_evaluation_context().expression_graph(equations_vector), ne.variable_tokens)
+        if transform_group is None:
+            print('Transform uses functions Geometry Nodes does not have, baking shape keys instead')
+            output_mode = 'SHAPE_KEYS'
 
     for _ in range(int(repeats)+1):
 
+        if output_mode == 'GEOMETRY_NODES':
+            transform_with_node_group(transform_group, animation_run_time, frames_per_calculation, transformation_type, keep_option)
+            continue
+
+        if is_batched and output_mode == 'SHAPE_KEYS':
+            # Live and cached output are written per object, so only shape keys are batched
+            yield from transform_batch_steps(equations_vector, animation_run_time, frames_per_calculation, transformation_type, keep_option, is_parallel, is_adaptive, adaptive_tolerance, prefetched)
+            prefetched = None
+            continue
+
         for obj in bpy.context.selected_objects:
             
             if obj and obj.type == 'MESH':
@@ -98,95 +166,307 @@ def transform(equations_vector, animation_run_time, frames_per_calculation, repe
                 
                 if len(mesh.vertices) > 0:
 
-                    startframe = 0.0
-                    smoothing_constant = 0.0
-                    is_instantaneous = False if animation_run_time > 0 else True
-                    framesPerSecond = 24
-                    frameDivisor = frames_per_calculation
-                    upperRange = int(math.floor(animation_run_time * framesPerSecond / frameDivisor))
-
-                    match transformation_type:
-                        case 'REGULAR':
-                            is_instantaneous = True
-                        case 'SMOOTH':
-                            smoothing_constant = 1.0
-                        case 'LINEAR':
-                            pass
-
-                    bpy.context.view_layer.objects.active = obj
+                    upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous = transform_settings(animation_run_time, frames_per_calculation, transformation_type)
+
                     bpy.context.scene.frame_start = 0
+                    use_global_undo = bpy.context.preferences.edit.use_global_undo
                     bpy.context.preferences.edit.use_global_undo = False
-                    original_object = bpy.context.active_object
-                    basisKey = 'Basis'
-
-                    if has_shape_key(original_object, 'Basis'):
-                        startframe = get_last_keyframe(original_object)
-                        basisKey = 'Key ' + str(startframe)
-                    else:
-                        obj.shape_key_add(name="Basis")
-
-                    bpy.ops.object.duplicate()
-                    activeObj = bpy.context.active_object
-
-                    if startframe!=0:
-                        activeObj.active_shape_key_index = activeObj.data.shape_keys.key_blocks.keys().index('Key ' + str(startframe))
-                        bpy.ops.object.shape_key_remove()
-
-                    for f in range(upperRange+1):
-                        frameIndex = f
-                        trueframe = frameIndex + startframe
-                        keyString = 'Key ' + str(float(startframe + (frameIndex) * frameDivisor))
-                        activeObj.shape_key_add(name=keyString)
-
-                        for i, v in enumerate(original_object.data.shape_keys.key_blocks[basisKey].data):
-                            
-                            remainder = 0
-
-                            if not is_instantaneous:
-                                remainder = (upperRange - frameIndex) / (upperRange)
-
-                            x0, y0, z0 = v.co.x, v.co.y, v.co.z
-                            xr, yr, zr = x0 * remainder * smoothing_constant, y0 * remainder * smoothing_constant, z0 * remainder * smoothing_constant
-                            x, y, z = x0 * (1 - remainder), y0 * (1 - remainder), z0 * (1 - remainder)
-                            t = ((frameIndex) * frameDivisor) / (framesPerSecond)
-                            T = ((upperRange) * frameDivisor) / (framesPerSecond)
-                            activeObj.data.shape_keys.key_blocks[keyString].data[i].co.x = safe_evaluation(equations_vector[0],x,y,z,t,T) + xr
-                            activeObj.data.shape_keys.key_blocks[keyString].data[i].co.y = safe_evaluation(equations_vector[1],x,y,z,t,T) + yr
-                            activeObj.data.shape_keys.key_blocks[keyString].data[i].co.z = safe_evaluation(equations_vector[2],x,y,z,t,T) + zr
-
-                        if ((frameIndex == 0) and (startframe != 0)):
-                            activeObj.data.shape_keys.key_blocks["Key " + str(startframe)].value = 0.0
-                            activeObj.data.shape_keys.key_blocks["Key " + str(startframe)].keyframe_insert("value", frame=(frameDivisor + startframe))
-
-                        if frameIndex != 0 or startframe != 0:
-                            activeObj.data.shape_keys.key_blocks[keyString].value = 0.0
-                            activeObj.data.shape_keys.key_blocks[keyString].keyframe_insert("value", frame=((frameIndex - 1) * frameDivisor + startframe))
-
-                        activeObj.data.shape_keys.key_blocks[keyString].value = 1.0
-                        activeObj.data.shape_keys.key_blocks[keyString].keyframe_insert("value", frame=((frameIndex) * frameDivisor + startframe))
-
-                        if frameIndex < upperRange:
-                            activeObj.data.shape_keys.key_blocks[keyString].value = 0.0
-                            activeObj.data.shape_keys.key_blocks[keyString].keyframe_insert("value", frame=((frameIndex + 1) * frameDivisor + startframe))
-                    
-                    match keep_option:
-                        case 'KEEP':
-                            pass
-                        case 'HIDE':
-                            original_object.hide_set(True)
-                        case 'DELETE':
-                            bpy.data.objects.remove(original_object, do_unlink=True)
-
-                    bpy.context.preferences.edit.use_global_undo = True
+                    original_object = obj
+                    activeObj, startframe, basisKey = begin_object_transform(original_object)
+
+                    # A live object can't keep shape keys, so one with earlier keys, such as the motion of a Transform
+                    # before this one, is baked to keep them
+                    object_mode = output_mode
+                    if output_mode == 'LIVE' and len(activeObj.data.shape_keys.key_blocks) > 1:
+                        print('Live Transform of ' + original_object.name + ' would drop its shape keys, baking shape keys instead')
+                        object_mode = 'SHAPE_KEYS'
+
+                    try:
+                        basis = nb.read_shape_key_float64(original_object.data.shape_keys.key_blocks[basisKey], 'basis')
+                        npf.add('vertices', len(basis))
+
+                        # Every frame only depends on the basis, t and T, so they are all known up front
+                        frame_parameters = transform_frame_parameters(upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous)
+
+                        is_prefetched = prefetched is not None and startframe == 0 and object_mode != 'LIVE' and not is_adaptive and np.array_equal(prefetched[0], basis)
+                        frames = bake_transform_frames(equations_vector, basis, frame_parameters, is_parallel, prefetched[1] if is_prefetched else None)
+                        if is_prefetched:
+                            prefetched = None
+
+                        if object_mode == 'LIVE':
+                            # Nothing is baked, the frame change handler evaluates whichever frame is shown
+                            nl.make_live(activeObj, get_evaluation_context(), equations_vector, basis, {
+                                'upper_range': upperRange,
+                                'frame_divisor': frameDivisor,
+                                'start_frame': startframe,
+                                'frames_per_second': framesPerSecond,
+                                'smoothing_constant': smoothing_constant,
+                                'is_instantaneous': is_instantaneous,
+                                'cache_frames': live_cache_frames,
+                            })
+
+                        elif object_mode == 'SHAPE_KEYS':
+
+                            if is_adaptive:
+                                frames = adaptive_shape_key_frames(equations_vector, basis, upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous, adaptive_tolerance)
+                            else:
+                                frames = ((frameIndex * frameDivisor, coordinates) for frameIndex, coordinates in frames)
+
+                            track = ShapeKeyTrack(activeObj, startframe, frameDivisor, is_adaptive)
+                            for position, coordinates in frames:
+                                track.add(position, coordinates)
+                                yield len(basis)
+                            track.finish()
+
+                        else:
+                            # Frames go straight to disk instead of becoming shape keys inside the .blend
+                            if object_mode == 'PC2' and len(activeObj.data.shape_keys.key_blocks) > 1:
+                                print('WARNING: The Mesh Cache of ' + activeObj.name + ' overrides the shape key animation it already has')
+                            cache_path = os.path.join(cache_folder(cache_directory), bpy.path.clean_name(activeObj.name) + nc.cache_extensions[object_mode])
+
+                            with nc.open_cache_writer(object_mode, cache_path, len(basis), upperRange + 1, startframe, frameDivisor) as cache_writer:
+                                for frameIndex, coordinates in frames:
+                                    cache_writer.write_frame(frameIndex, coordinates)
+                                    yield len(basis)
+
+                            if object_mode == 'PC2':
+                                nc.attach_mesh_cache(activeObj, cache_path, startframe, frameDivisor)
+                            else:
+                                print('Frames of ' + activeObj.name + ' exported to ' + cache_path + ', NumPy caches are not played back')
+
+                        keep_original(original_object, keep_option)
+
+                    except GeneratorExit:
+                        # Cancelled part way: the unfinished copy goes and the original stays as it was
+                        bpy.data.objects.remove(activeObj, do_unlink=True)
+                        raise
+                    finally:
+                        bpy.context.preferences.edit.use_global_undo = use_global_undo
+
                     bpy.context.scene.frame_end = int(upperRange*frameDivisor + startframe)
 
-def bpy_select_all():
-    bpy.ops.object.select_all(action='SELECT')
+def transform_batch_steps(equations_vector, animation_run_time, frames_per_calculation, transformation_type, keep_option, is_parallel, is_adaptive, adaptive_tolerance, prefetched):
+
+    # The bases of all selected meshes are put one after another into a single buffer, so every frame is
+    # evaluated once for all of them; offsets[i]:offsets[i + 1] is the part of the buffer that is object i's
+    originals = [obj for obj in bpy.context.selected_objects if obj and obj.type == 'MESH' and len(obj.data.vertices) > 0]
+    if not originals:
+        return
+
+    upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous = transform_settings(animation_run_time, frames_per_calculation, transformation_type)
+
+    bpy.context.scene.frame_start = 0
+    use_global_undo = bpy.context.preferences.edit.use_global_undo
+    bpy.context.preferences.edit.use_global_undo = False
+
+    copies = []
     try:
-        bpy.context.view_layer.objects.active = bpy.context.selected_objects[-1]
-    except IndexError:
-        bpy.context.view_layer.objects.active = None
-    return
+        offsets = np.zeros(len(originals) + 1, dtype=np.int64)
+        np.cumsum([len(obj.data.vertices) for obj in originals], out=offsets[1:])
+        basis = nb.get_coordinate_buffer('batch_basis', int(offsets[-1]), np.float64)
+
+        startframes = []
+        for index, original_object in enumerate(originals):
+            activeObj, startframe, basisKey = begin_object_transform(original_object)
+            copies.append(activeObj)
+            startframes.append(startframe)
+            basis[offsets[index]:offsets[index + 1]] = nb.read_shape_key(original_object.data.shape_keys.key_blocks[basisKey], 'basis')
+        npf.add('vertices', len(basis))
+
+        if is_adaptive:
+            frames = adaptive_shape_key_frames(equations_vector, basis, upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous, adaptive_tolerance)
+        else:
+            frame_parameters = transform_frame_parameters(upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous)
+            is_prefetched = prefetched is not None and not any(startframes) and np.array_equal(prefetched[0], basis)
+            frames = bake_transform_frames(equations_vector, basis, frame_parameters, is_parallel, prefetched[1] if is_prefetched else None)
+            frames = ((frameIndex * frameDivisor, coordinates) for frameIndex, coordinates in frames)
+
+        # Each frame is scattered back to every copy's own shape key, the same keys a run per object makes
+        tracks = [ShapeKeyTrack(activeObj, startframe, frameDivisor, is_adaptive) for activeObj, startframe in zip(copies, startframes)]
+        for position, coordinates in frames:
+            for index, track in enumerate(tracks):
+                track.add(position, coordinates[offsets[index]:offsets[index + 1]])
+            yield len(basis)
+        for track in tracks:
+            track.finish()
+
+        for original_object in originals:
+            keep_original(original_object, keep_option)
+
+    except GeneratorExit:
+        for activeObj in copies:
+            bpy.data.objects.remove(activeObj, do_unlink=True)
+        raise
+    finally:
+        bpy.context.preferences.edit.use_global_undo = use_global_undo
+
+    bpy.context.scene.frame_end = int(upperRange*frameDivisor + max(startframes))
+
+def transform_with_node_group(transform_group, animation_run_time, frames_per_calculation, transformation_type, keep_option):
+
+    # Nothing is baked, a Geometry Nodes modifier computes the positions of whichever frame is shown
+    upperRange, frameDivisor, framesPerSecond, smoothing_constant, is_instantaneous = transform_settings(animation_run_time, frames_per_calculation, transformation_type)
+    run_time = upperRange * frameDivisor / framesPerSecond
+    bpy.context.scene.frame_start = 0
+
+    for obj in bpy.context.selected_objects:
+
+        if obj and obj.type == 'MESH' and len(obj.data.vertices) > 0:
+
+            # Continues from where the object's keys or its earlier node group transforms end
+            startframe = max(get_last_keyframe(obj), ngm.transform_end_frame(obj))
+            activeObj = duplicate_object(obj)
+            ngm.attach_transform(activeObj, transform_group, {
+                'Start Frame': startframe,
+                'Run Time': run_time,
+                'Frames Per Second': framesPerSecond,
+                'Shrink': 0.0 if is_instantaneous or run_time == 0 else 1.0,
+                'Smoothing': smoothing_constant,
+            })
+            npf.add('vertices', len(obj.data.vertices))
+
+            keep_original(obj, keep_option)
+            bpy.context.scene.frame_end = int(upperRange*frameDivisor + startframe)
+
+def cache_folder(cache_directory):
+    # A path relative to an unsaved .blend would resolve against whatever folder Blender was started from
+    if cache_directory.startswith('//') and not bpy.data.filepath:
+        folder = os.path.join(bpy.app.tempdir, cache_directory[2:])
+        print('The .blend is not saved, caches are written to ' + folder + ' which Blender removes when it quits')
+        return folder
+    return bpy.path.abspath(cache_directory)
+
+def begin_object_transform(obj):
+    # Gives obj a Basis key if it has none and makes the copy the frames are written to.
+    # Returns the copy, the frame the new keys start from and the key they start from.
+    startframe = 0.0
+    basisKey = 'Basis'
+
+    if has_shape_key(obj, 'Basis'):
+        startframe = get_last_keyframe(obj)
+        # A cache output keeps its Basis key but has no keyframes or keys to continue from
+        if has_shape_key(obj, 'Key ' + str(startframe)):
+            basisKey = 'Key ' + str(startframe)
+    else:
+        obj.shape_key_add(name="Basis")
+
+    activeObj = duplicate_object(obj)
+    if startframe!=0 and basisKey != 'Basis':
+        activeObj.shape_key_remove(activeObj.data.shape_keys.key_blocks[basisKey])
+    return activeObj, startframe, basisKey
+
+def bake_transform_frames(equations_vector, basis, frame_parameters, is_parallel, prefetched_frames=None):
+    # Yields (frame_index, coordinates) of every frame from basis
+    frame_coordinates = nb.get_coordinate_buffer('frame', len(basis))
+
+    if prefetched_frames is not None:
+        # Calculated ahead on a worker thread from this same basis
+        npf.add('evaluations', len(basis) * len(equations_vector) * len(frame_parameters))
+        return enumerate(prefetched_frames)
+    elif is_parallel:
+        # Evaluated in other processes, counted here
+        npf.add('evaluations', len(basis) * len(equations_vector) * len(frame_parameters))
+        return npr.bake_frames(get_evaluation_context(), equations_vector, basis, frame_parameters, frame_coordinates)
+    else:
+        # Compiled once per run and shared by every frame; each frame is evaluated as one array
+        vector_kernel = get_evaluation_context().vector_kernel(equations_vector)
+        scratch = nb.get_coordinate_buffer('frame_scratch', len(basis), np.float64)
+        return ne.bake_frames(vector_kernel, basis, frame_parameters, frame_coordinates, scratch)
+
+class ShapeKeyTrack:
+
+    # The shape keys of one object and their keyframes: each key rises from the previous key's frame, peaks on
+    # its own and falls at the next key's frame. An adaptive bake keeps only the frames that linear
+    # interpolation between keys cannot reproduce, so its keys must not ease (is_linear).
+    def __init__(self, obj, startframe, frameDivisor, is_linear=False):
+        self.obj = obj
+        self.startframe = startframe
+        self.frameDivisor = frameDivisor
+        self.animation_writer = na.ShapeKeyAnimationWriter(obj.data.shape_keys, is_linear)
+        self.previous = None
+
+    def add(self, position, coordinates):
+        trueframe = position + self.startframe
+        keyString = 'Key ' + str(float(trueframe))
+        key_block = self.obj.shape_key_add(name=keyString)
+        nb.write_shape_key(key_block, coordinates)
+        npf.add('shape_keys')
+
+        if self.previous is not None:
+            self.animation_writer.insert(self.previous[1], trueframe, 0.0)
+            self.animation_writer.insert(key_block, self.previous[0], 0.0)
+        elif self.startframe != 0:
+            self.animation_writer.insert(key_block, (self.startframe - self.frameDivisor), 0.0)
+
+        self.animation_writer.insert(key_block, trueframe, 1.0)
+        self.previous = (trueframe, key_block)
+
+    def finish(self):
+        self.animation_writer.flush()
+        npf.add('keyframes', self.animation_writer.written)
+
+def keep_original(obj, keep_option):
+    match keep_option:
+        case 'KEEP':
+            pass
+        case 'HIDE':
+            obj.hide_set(True)
+        case 'DELETE':
+            bpy.data.objects.remove(obj, do_unlink=True)
+
+transform_settings = nco.transform_settings
+transform_frame_parameters = nco.transform_frame_parameters
+
+# Frames calculated ahead of Transforms are held in memory until they run, at most this much for all of them
+prefetch_memory_limit = 512 * 1024 * 1024
+
+def prefetch_transform_frames(vertices, equations_vector, animation_run_time, frames_per_calculation, transformation_type, reserve):
+    # The frames a Transform would bake from a fresh grid, calculated without bpy so a worker thread can do it.
+    # Returns (basis, frames) or None when reserve refuses the memory they would take.
+    basis = vertices.astype(np.float64)
+    frames = nco.transform_frames(get_evaluation_context(), basis, equations_vector, animation_run_time, frames_per_calculation, transformation_type, reserve)
+    return None if frames is None else (basis, frames)
+
+def adaptive_shape_key_frames(*arguments):
+    return nco.adaptive_shape_key_frames(get_evaluation_context(), *arguments)
+
+def duplicate_object(obj):
+    # What Duplicate Objects does for one mesh with the default preferences, without the operator: the copy has
+    # its own mesh, shape keys and shape key action, sits in the same collections and becomes the only one selected
+    duplicate = obj.copy()
+    duplicate.data = obj.data.copy()
+    shape_keys = duplicate.data.shape_keys
+    if shape_keys and shape_keys.animation_data and shape_keys.animation_data.action:
+        shape_keys.animation_data.action = shape_keys.animation_data.action.copy()
+    for collection in obj.users_collection:
+        collection.objects.link(duplicate)
+
+    obj.select_set(False)
+    duplicate.select_set(True)
+    bpy.context.view_layer.objects.active = duplicate
+    return duplicate
+
+@contextmanager
+def suspended_updates():
+    # For the length of a run no undo steps are pushed and nothing asks for the scene to be evaluated; the
+    # view layer is updated once at the end
+    edit = bpy.context.preferences.edit
+    use_global_undo = edit.use_global_undo
+    edit.use_global_undo = False
+    try:
+        yield
+    finally:
+        edit.use_global_undo = use_global_undo
+        bpy.context.view_layer.update()
+
+def bpy_select_all():
+    # Like Select All, only objects that can be seen and selected in the view layer
+    selected = None
+    for obj in bpy.context.view_layer.objects:
+        if not obj.hide_select and obj.visible_get():
+            obj.select_set(True)
+            selected = obj
+    bpy.context.view_layer.objects.active = selected
 
 def bpy_select_by_name(object_name):
     obj = bpy.data.objects.get(object_name)
@@ -196,7 +476,8 @@ def bpy_select_by_name(object_name):
         obj.select_set(True)
 
 def bpy_deselect_all():
-    bpy.ops.object.select_all(action='DESELECT')
+    for obj in bpy.context.selected_objects:
+        obj.select_set(False)
     bpy.context.view_layer.objects.active = None
 
 def bpy_deselect_by_name(object_name):
@@ -206,113 +487,47 @@ def bpy_deselect_by_name(object_name):
     if obj:
         obj.select_set(False)
 
-def bpy_delete_selected_objects():
-    # Check if there are selected objects
-    if bpy.context.selected_objects:
-        # Set the mode to object mode to avoid context errors
+def leave_edit_mode():
+    # Objects can't be removed or hidden from under an edit mode
+    if bpy.context.mode != 'OBJECT':
         bpy.ops.object.mode_set(mode='OBJECT')
-        # Delete all selected objects
-        bpy.ops.object.delete()
-    else:
-        bpy.context.view_layer.objects.active = None
 
-def bpy_hide_selected_objects():
-    # Check if there are selected objects
-    if bpy.context.selected_objects:
-        # Set the mode to object mode to avoid context errors
-        bpy.ops.object.mode_set(mode='OBJECT')
-        # Delete all selected objects
-        bpy.ops.object.hide_set(True)
-    else:
-        bpy.context.view_layer.objects.active = None
-
-def bpy_join_all(objects):
-    bpy.context.view_layer.objects.active = objects[0]
-    for obj in objects:  # Select only the objects in the array
-        obj.select_set(True)
-    bpy.ops.object.join()
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.remove_doubles()
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-def bmesh_select_geometry(bm, lowerVector, upperVector): # select faces within difference of coordinates between two vectors
-
-    for f in bm.faces:
-        f.select = False
-    for f in bm.faces:
-        vector = f.calc_center_median()
-        if lowerVector.x < vector[0] < upperVector.x and \
-                lowerVector.y < vector[1] < upperVector.y and \
-                lowerVector.z < vector[2] < upperVector.z:
-            f.select = True
-
-def bmesh_selection_to_bmesh(obj):
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
-    return bm
-
-def bmesh_embody_mesh(bm):
-    mesh = bpy.data.meshes.new("Mesh")
-    obj = bpy.data.objects.new("Mesh", mesh)
-    bpy.context.collection.objects.link(obj)
-    bm.to_mesh(mesh)
-    bm.free()
-    return obj  # Return the created object
-
-def math_return_vector(x, y, z):
-    return mathutils.Vector((x, y, z))
-
-def math_scale_vector(input_vector, scale):
-    return math_return_vector(input_vector[0] * scale, input_vector[1] * scale, input_vector[2] * scale)
-
-def math_flatten_bmesh(bm, scaleVector):
-    for v in bm.verts:
-        scale_Matrix = mathutils.Matrix.Diagonal(scaleVector).to_4x4()
-        v.co = scale_Matrix @ v.co
-    return
+def bpy_delete_selected_objects():
+    selected = bpy.context.selected_objects
+    if selected:
+        leave_edit_mode()
+        for obj in selected:
+            bpy.data.objects.remove(obj, do_unlink=True)
+    bpy.context.view_layer.objects.active = None
 
-def math_translate_bmesh(bm, directionVector):
-    for v in bm.verts:
-        translation_Matrix = mathutils.Matrix.Translation(directionVector)
-        v.co = translation_Matrix @ v.co
-    return
+def bpy_hide_selected_objects():
+    selected = bpy.context.selected_objects
+    if selected:
+        leave_edit_mode()
+        for obj in selected:
+            obj.select_set(False)
+            obj.hide_set(True)
+    bpy.context.view_layer.objects.active = None
 
 def get_keyframes(obj):
     keyframes = []
+    seen = set()
     anim = obj.animation_data
     if anim is not None and anim.action is not None:
         for fcu in anim.action.fcurves:
             for keyframe in fcu.keyframe_points:
                 x, y = keyframe.co
-                if x not in keyframes:
-                    keyframes.append(math.ceil(x))
+                frame = math.ceil(x)
+                if frame not in seen:
+                    seen.add(frame)
+                    keyframes.append(frame)
     if not keyframes:
         return 0
     return int(keyframes[-1])
 
-def get_secondlast_keyframe(ob):
-    if hasattr(ob.data, "shape_keys") and ob.data.shape_keys:
-        action = ob.data.shape_keys.animation_data.action
-        last_frame = None
-        second_last_frame = None
-        for fcu in action.fcurves:
-            for keyframe in fcu.keyframe_points:
-                if last_frame is None or keyframe.co[0] > last_frame:
-                    second_last_frame = last_frame
-                    last_frame = keyframe.co[0]
-        return int(second_last_frame) if second_last_frame else None
-    else:
-        return None
-
 def get_last_keyframe(ob):
     if hasattr(ob.data, "shape_keys") and ob.data.shape_keys:
-        action = ob.data.shape_keys.animation_data.action
-        last_frame = None
-        for fcu in action.fcurves:
-            for keyframe in fcu.keyframe_points:
-                if last_frame is None or keyframe.co[0] > last_frame:
-                    last_frame = keyframe.co[0]
+        last_frame = na.get_last_keyframe(ob.data.shape_keys)
         return float(last_frame) if last_frame else 0.0 
     else:
         return 0.0 
@@ -324,45 +539,28 @@ def has_shape_key(ob, name):
         ob.data.shape_keys.key_blocks.get(name)
     )
 
-def safe_evaluation(input, trfx=None, trfy=None, trfz=None, trft=None, trfT=None):
-
-    expressions = [input] if isinstance(input, str) else input
+def begin_evaluation_run():
+    global evaluation_context
 
     library_collection = bpy.context.scene.library_collection
     filepath_collection = bpy.context.scene.filepath_collection
 
-    allowed_libraries = {'__builtins__': __builtins__, '[x]':trfx,'[y]':trfy,'[z]':trfz,'[t]':trft,'[T]':trfT}
-    
-    for library_element in library_collection:
-        try:
-            allowed_libraries[library_element.library_name] = importlib.import_module(library_element.library_name)
-        except ImportError:
-            print('no library imported')
-    
-    for filepath_element in filepath_collection:
-
-        file_path = filepath_element.filepath_name
-        # Extract the module name from the file path
-        module_name = file_path.split('/')[-1].replace('.py', '')
-        # Create a module spec
-        spec = importlib.util.spec_from_file_location(module_name, file_path)
-        # Create a new module based on the spec
-        module = importlib.util.module_from_spec(spec)
-
-        try:
-            # Execute the module in its own namespace
-            spec.loader.exec_module(module)
-            # Add the loaded and executed module to your dictionary
-            allowed_libraries[filepath_element.module_name] = module
-        except Exception as e:  # Catch broader exceptions if the loading or executing fails
-            print(f'Failed to import {module_name}: {str(e)}')
-
-    return_list = []
-    for item in expressions:
-        try:
-            return_list.append(eval(item, allowed_libraries))
-            # print(eval(item, allowed_libraries))
-        except TypeError:
-            print('Expression is not evaluable')
-    
-    return return_list[0] if isinstance(input, str) else return_list
+    evaluation_context = ne.EvaluationContext(
+        [library_element.library_name for library_element in library_collection],
+        [(filepath_element.filepath_name, filepath_element.module_name) for filepath_element in filepath_collection],
+    )
+    return evaluation_context
+
+def get_evaluation_context():
+    return evaluation_context if evaluation_context is not None else begin_evaluation_run()
+
+# Live objects restored from a saved file compile their equations against the scene's imports
+nl.ne = ne
+nl.context_factory = get_evaluation_context
+
+# Evaluations are counted against the node being measured
+ne.count_evaluations = lambda count: npf.add('evaluations', count)
+ne.note_per_vertex = npf.add_per_vertex
+
+def safe_evaluation(input, trfx=None, trfy=None, trfz=None, trft=None, trfT=None):
+    return get_evaluation_context().evaluate(input, trfx, trfy, trfz, trft, trfT)
@@ -0,0 +1,187 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+# This module never imports bpy, the worker processes run it outside of Blender
+
+import os
+import sys
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# The workers are separate processes that load this module on their own, so unlike the add-on's other
+# modules it loads its own NodeEvaluation instead of sharing NodeMechanics' one
+module_name = "NodeEvaluation"  # Name of the module you want to import
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
+
+# Load the module
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+ne = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ne)
+
+# The pool stays alive between runs, it is only replaced when the imports it was warmed with change
+pool = None
+pool_key = None
+
+# Set inside each worker by initialize_worker
+worker_context = None
+
+def initialize_worker(library_names, file_modules):
+    global worker_context
+    worker_context = ne.EvaluationContext(library_names, file_modules)
+
+def file_modification_times(file_modules):
+    times = []
+    for file_path, module_name in file_modules:
+        try:
+            times.append(os.path.getmtime(file_path))
+        except OSError:
+            times.append(None)
+    return tuple(times)
+
+def get_pool(library_names, file_modules, workers=None):
+    global pool, pool_key
+
+    library_names = tuple(library_names)
+    file_modules = tuple(tuple(file_module) for file_module in file_modules)
+    workers = workers or os.cpu_count() or 1
+    key = (library_names, file_modules, file_modification_times(file_modules), workers)
+
+    if pool is not None and pool_key == key:
+        return pool
+
+    shutdown_pool()
+
+    # Spawned workers import this module by name, so its folder has to be on their path
+    if current_dir not in sys.path:
+        sys.path.append(current_dir)
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=initialize_worker,
+        initargs=(library_names, file_modules),
+    )
+    pool_key = key
+    return pool
+
+def shutdown_pool():
+    global pool, pool_key
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    pool = None
+    pool_key = None
+
+def evaluate_frame_range(equations, basis_name, vertex_count, output_name, slot_count, first_slot, frame_parameters):
+
+    basis_block = SharedMemory(name=basis_name)
+    output_block = SharedMemory(name=output_name)
+
+    try:
+        basis = np.ndarray((vertex_count, 3), dtype=np.float64, buffer=basis_block.buf)
+        output = np.ndarray((slot_count, vertex_count, 3), dtype=np.float32, buffer=output_block.buf)
+        scratch = np.empty((vertex_count, 3), dtype=np.float64)
+        vector_kernel = worker_context.vector_kernel(equations)
+
+        for offset, (remainder, smoothing_constant, t, T) in enumerate(frame_parameters):
+            ne.evaluate_frame(vector_kernel, basis, remainder, smoothing_constant, t, T, output[first_slot + offset], scratch)
+
+        # The views have to be released before the blocks can be closed
+        del basis, output
+    finally:
+        basis_block.close()
+        output_block.close()
+
+def bake_frames(evaluation_context, equations, basis, frame_parameters, out=None, workers=None, frames_per_task=4):
+    # Yields (frame_index, coordinates) in order, the same as NodeEvaluation.bake_frames. Each frame is
+    # copied out of shared memory into out, so the caller can write it to bpy while the workers continue
+
+    workers = workers or os.cpu_count() or 1
+    executor = get_pool(evaluation_context.library_names, evaluation_context.file_modules, workers)
+
+    equations = tuple(equations)
+    vertex_count = len(basis)
+    frame_count = len(frame_parameters)
+    batch_frames = workers * frames_per_task
+
+    # Two halves so the workers fill the next batch while the main thread writes the current one
+    slot_count = 2 * batch_frames
+    basis_block = SharedMemory(create=True, size=max(basis.nbytes, 1))
+    output_block = SharedMemory(create=True, size=max(slot_count * vertex_count * 3 * 4, 1))
+
+    shared_basis = np.ndarray(basis.shape, dtype=np.float64, buffer=basis_block.buf)
+    shared_basis[:] = basis
+    output = np.ndarray((slot_count, vertex_count, 3), dtype=np.float32, buffer=output_block.buf)
+
+    if out is None:
+        out = np.empty((vertex_count, 3), dtype=np.float32)
+
+    def submit_batch(batch_index):
+        first_frame = batch_index * batch_frames
+        half = (batch_index % 2) * batch_frames
+        futures = []
+        for start in range(first_frame, min(first_frame + batch_frames, frame_count), frames_per_task):
+            futures.append(executor.submit(
+                evaluate_frame_range,
+                equations,
+                basis_block.name,
+                vertex_count,
+                output_block.name,
+                slot_count,
+                half + start - first_frame,
+                frame_parameters[start:min(start + frames_per_task, frame_count)],
+            ))
+        return futures
+
+    pending = []
+    upcoming = []
+
+    try:
+        batch_count = (frame_count + batch_frames - 1) // batch_frames
+        pending = submit_batch(0) if batch_count else []
+
+        for batch_index in range(batch_count):
+            upcoming = submit_batch(batch_index + 1) if batch_index + 1 < batch_count else []
+
+            for future in pending:
+                future.result()
+
+            first_frame = batch_index * batch_frames
+            half = (batch_index % 2) * batch_frames
+            for frame_index in range(first_frame, min(first_frame + batch_frames, frame_count)):
+                np.copyto(out, output[half + frame_index - first_frame])
+                yield frame_index, out
+
+            pending = upcoming
+            upcoming = []
+    finally:
+        # Cancelling only stops tasks that have not started. The running ones still attach to the blocks, so
+        # they are waited for before the blocks go; on Windows a block can't be removed while it is mapped.
+        for future in pending + upcoming:
+            future.cancel()
+        wait(pending + upcoming)
+        del shared_basis, output
+        basis_block.close()
+        basis_block.unlink()
+        output_block.close()
+        output_block.unlink()
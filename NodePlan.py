@@ -0,0 +1,112 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+# Tree pointer -> (structure, ExecutionPlan). A plan is rebuilt only when the nodes or links of its tree change.
+plans = {}
+
+def linked_nodes(node, sockets, side):
+    nodes = []
+    for socket in getattr(node, sockets, ()):
+        if socket.is_linked:
+            for link in socket.links:
+                nodes.append(getattr(link, side))
+    return nodes
+
+def output_nodes(node):
+    return linked_nodes(node, 'outputs', 'to_node')
+
+def input_nodes(node):
+    return linked_nodes(node, 'inputs', 'from_node')
+
+def depth_first_order(start_node, neighbours):
+    # Iterative post-order from start_node. Neighbours are visited in the order they are linked; a link back to a
+    # node that is still being visited closes a loop and is left out, with a warning.
+    order = []
+    state = {start_node.name: 'open'}
+    stack = [(start_node, iter(neighbours(start_node)))]
+    while stack:
+        node, remaining = stack[-1]
+        neighbour = next(remaining, None)
+        if neighbour is None:
+            stack.pop()
+            state[node.name] = 'done'
+            order.append(node.name)
+        elif state.get(neighbour.name) == 'open':
+            print('Loop in the node tree ignored at: ' + neighbour.name)
+        elif neighbour.name not in state:
+            state[neighbour.name] = 'open'
+            stack.append((neighbour, iter(neighbours(neighbour))))
+    return order
+
+def link_pairs(node_tree):
+    return [(link.from_node.name, link.to_node.name) for link in node_tree.links if link.is_valid]
+
+def ordered_links(pairs, order):
+    # For every node in order, the nodes linked into it that come before it. Links against the order are the
+    # ones that close loops and are left out.
+    position = {name: index for index, name in enumerate(order)}
+    linked = {name: [] for name in order}
+    for source, target in pairs:
+        if source in position and target in position and position[source] < position[target] and source not in linked[target]:
+            linked[target].append(source)
+    return linked
+
+class ExecutionPlan:
+
+    # The nodes reachable from the Start node in the order they run, each node listed once.
+    # A node with several incoming links (a merge) runs once, after every node that links into it has run,
+    # and only if at least one of them ran and let the run continue.
+    # Trees that are not Blender node trees pass their own neighbour functions and (source, target) name pairs.
+    def __init__(self, start_node, outputs=output_nodes, inputs=input_nodes, pairs=None):
+        self.start_name = start_node.name
+        pairs = link_pairs(start_node.id_data) if pairs is None else pairs
+
+        # Reverse post-order with the outputs visited last-to-first, so a tree without merges runs depth first
+        # in link order, as it always has
+        order = depth_first_order(start_node, lambda node: outputs(node)[::-1])[::-1]
+        self.order = order[1:]
+        self.predecessors = ordered_links(pairs, order)
+
+        # Dictionary, Library and File Import nodes feeding the Start node, sources first
+        back_order = depth_first_order(start_node, inputs)
+        self.back_order = back_order[:-1]
+        self.back_predecessors = ordered_links(pairs, back_order)
+        self.back_successors = {name: [] for name in back_order}
+        for name, sources in self.back_predecessors.items():
+            for source in sources:
+                self.back_successors[source].append(name)
+
+def tree_structure(node_tree):
+    # Everything the plan depends on: which nodes exist and how they are linked
+    return (
+        tuple(node.name for node in node_tree.nodes),
+        tuple((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier) for link in node_tree.links),
+    )
+
+def get_plan(start_node):
+    node_tree = start_node.id_data
+    key = node_tree.as_pointer()
+    structure = tree_structure(node_tree)
+    cached = plans.get(key)
+    if cached is None or cached[0] != structure or cached[1].start_name != start_node.name:
+        cached = (structure, ExecutionPlan(start_node))
+        plans[key] = cached
+    return cached[1]
+
+def invalidate_plan(node_tree):
+    plans.pop(node_tree.as_pointer(), None)
@@ -0,0 +1,242 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import os
+import re
+import sys
+import json
+import time
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None # Not available on Windows
+
+# What every node counts while it runs
+counter_names = ('evaluations', 'vertices', 'shape_keys', 'keyframes')
+
+# The counters of the node being measured and the thread running it. Work done on other threads, such as
+# calculating ahead, is not counted against whichever node happens to be running.
+counters = None
+counting_thread = None
+
+# The expressions the current run had to evaluate one vertex at a time, noted from any thread
+per_vertex_expressions = None
+
+def add(name, amount=1):
+    if counters is not None and threading.get_ident() == counting_thread:
+        counters[name] += amount
+
+def add_per_vertex(expressions):
+    if per_vertex_expressions is not None:
+        per_vertex_expressions.update(expressions)
+
+def peak_rss():
+    # The largest the process has been since it started, in bytes. It never goes down, so a node or run is
+    # measured by how much it raised it.
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def rss_growth(before, after):
+    return None if before is None or after is None else after - before
+
+def file_name(name):
+    return re.sub(r'[^\w.-]+', '_', name)
+
+class RunProfile:
+
+    # Wall time, work counters and memory of every node in one run. With is_profiled, every node also runs
+    # under cProfile and tracemalloc, which slows the run down, and write() saves a timeline and the statistics.
+    def __init__(self, is_profiled=False):
+        global per_vertex_expressions
+        self.is_profiled = is_profiled
+        self.per_vertex_expressions = per_vertex_expressions = set()
+        self.start = time.perf_counter()
+        self.start_peak_rss = peak_rss()
+        self.nodes = []
+        self.profiles = []
+        # The node being measured, and when it last resumed (None while suspended)
+        self.entry = None
+        self.profile = None
+        self.resumed = None
+        self.elapsed = 0.0
+        self.peak_allocated = 0
+        if is_profiled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def measure(self, name, automation_type):
+        self.entry = {'name': name, 'type': automation_type, 'counters': dict.fromkeys(counter_names, 0)}
+        self.entry['start'] = time.perf_counter() - self.start
+        self.profile = cProfile.Profile() if self.is_profiled else None
+        self.elapsed = 0.0
+        self.peak_allocated = 0
+        entry_peak_rss = peak_rss()
+        self.resume()
+        try:
+            yield self.entry
+        finally:
+            self.suspend()
+            entry = self.entry
+            entry['time'] = self.elapsed
+            entry['peak_rss_growth'] = rss_growth(entry_peak_rss, peak_rss())
+            if self.profile is not None:
+                entry['peak_allocated'] = self.peak_allocated
+                self.profiles.append((name, self.profile))
+            self.entry = None
+            self.nodes.append(entry)
+
+    def suspend(self):
+        # While a run driven from the Start button waits for its next slice, Blender is idle or runs other code,
+        # so the node's clock, counters and profilers stop until resume()
+        global counters
+        if self.entry is None or self.resumed is None:
+            return
+        self.elapsed += time.perf_counter() - self.resumed
+        self.resumed = None
+        if self.profile is not None:
+            self.profile.disable()
+            self.peak_allocated = max(self.peak_allocated, tracemalloc.get_traced_memory()[1])
+        counters = None
+
+    def resume(self):
+        global counters, counting_thread
+        if self.entry is None or self.resumed is not None:
+            return
+        counters = self.entry['counters']
+        counting_thread = threading.get_ident()
+        if self.profile is not None:
+            tracemalloc.reset_peak()
+            self.profile.enable()
+        self.resumed = time.perf_counter()
+
+    def report(self):
+        # A summary that can be stored as JSON
+        totals = dict.fromkeys(counter_names, 0)
+        for entry in self.nodes:
+            for name in counter_names:
+                totals[name] += entry['counters'][name]
+        process_peak_rss = peak_rss()
+        return {
+            'time': time.perf_counter() - self.start,
+            'totals': totals,
+            'process_peak_rss': process_peak_rss,
+            'peak_rss_growth': rss_growth(self.start_peak_rss, process_peak_rss),
+            'nodes': [{key: value for key, value in entry.items()} for entry in self.nodes],
+            'per_vertex': sorted(self.per_vertex_expressions),
+        }
+
+    def trace(self):
+        # Chrome trace event format, opened by chrome://tracing and ui.perfetto.dev
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': 'Node Form'}}]
+        for entry in self.nodes:
+            arguments = dict(entry['counters'])
+            arguments.update({key: entry[key] for key in ('peak_rss_growth', 'peak_allocated', 'reused') if key in entry})
+            events.append({
+                'name': entry['name'],
+                'cat': entry['type'],
+                'ph': 'X',
+                'ts': entry['start'] * 1e6,
+                'dur': entry['time'] * 1e6,
+                'pid': os.getpid(),
+                'tid': 1,
+                'args': arguments,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, directory):
+        # trace.json with the timeline of the run and one cProfile statistics file per node
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'trace.json'), 'w') as file:
+            json.dump(self.trace(), file)
+        for index, (name, profile) in enumerate(self.profiles):
+            profile.dump_stats(os.path.join(directory, f'{index:03d}_{file_name(name)}.prof'))
+        tracemalloc.stop()
+        return directory
+
+class RunProgress:
+
+    # How far a run has come, for the progress bar and status line while it runs from the Start button
+    def __init__(self, node_count):
+        self.node_count = max(node_count, 1)
+        self.nodes_done = 0
+        self.node_name = ''
+        self.frames = 0
+        self.vertices = 0
+        self.start = time.perf_counter()
+
+    def begin_node(self, name):
+        self.node_name = name
+
+    def finish_node(self):
+        self.nodes_done += 1
+
+    def add_frame(self, vertices):
+        self.frames += 1
+        self.vertices += vertices
+
+    def fraction(self):
+        return min(self.nodes_done / self.node_count, 1.0)
+
+    def status(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f'Node Form: {self.node_name} ({self.nodes_done + 1}/{self.node_count})  '
+                f'{self.frames / elapsed:.1f} frames/s  {self.vertices / elapsed:,.0f} vertices/s  Esc to cancel')
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f'{count:.0f} {unit}' if unit == 'B' else f'{count:.1f} {unit}'
+        count /= 1024
+
+def summary_lines(report_json):
+    # The lines the Start node shows about the last run
+    if not report_json:
+        return []
+    try:
+        report = json.loads(report_json)
+    except ValueError:
+        return []
+
+    totals = report['totals']
+    lines = [
+        f"Last run: {report['time']:.2f} s",
+        f"Evaluations: {totals['evaluations']:,}  Vertices: {totals['vertices']:,}",
+        f"Shape keys: {totals['shape_keys']:,}  Keyframes: {totals['keyframes']:,}",
+    ]
+    if report.get('process_peak_rss') is not None:
+        lines.append(f"Process peak memory: {format_bytes(report['process_peak_rss'])}, this run raised it {format_bytes(report['peak_rss_growth'])}")
+    allocated = [entry['peak_allocated'] for entry in report['nodes'] if 'peak_allocated' in entry]
+    if allocated:
+        lines.append('Peak allocated by one node: ' + format_bytes(max(allocated)))
+
+    slowest = sorted(report['nodes'], key=lambda entry: entry['time'], reverse=True)[:3]
+    for entry in slowest:
+        lines.append(f"{entry['name']}: {entry['time']:.2f} s" + (' (reused)' if entry.get('reused') else ''))
+
+    per_vertex = report.get('per_vertex', [])
+    if per_vertex:
+        lines.append(f'Not vectorizable, evaluated per vertex ({len(per_vertex)}):')
+        lines.extend(per_vertex)
+    return lines
@@ -0,0 +1,125 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Threads rather than processes: the work is NumPy array math, which runs outside the interpreter lock
+executor = None
+
+def get_executor():
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='node_form')
+    return executor
+
+def shutdown_executor():
+    global executor
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+        executor = None
+
+def find_branches(plan):
+    # Groups of nodes after the Start node that share no node, each in plan order
+    parent = {name: name for name in plan.order}
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for name in plan.order:
+        for predecessor in plan.predecessors[name]:
+            if predecessor in parent:
+                parent[find(predecessor)] = find(name)
+
+    branches = {}
+    for name in plan.order:
+        branches.setdefault(find(name), []).append(name)
+    return list(branches.values())
+
+class MemoryBudget:
+
+    # Bytes that results calculated ahead may hold at once, shared by every branch
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def reserve(self, size):
+        with self.lock:
+            if self.used + size > self.limit:
+                return False
+            self.used += size
+            return True
+
+    def release(self, size):
+        with self.lock:
+            self.used -= size
+
+class Prefetch:
+
+    # The bpy-free stages of every branch, started together on worker threads. The main thread runs the plan
+    # as before and picks up each result when it reaches the node, so the run takes about as long as the
+    # longest branch instead of all of them in turn. Each node has its own future, so the main thread waits
+    # only for the node it needs, and the results waiting to be picked up share one memory budget.
+    def __init__(self, branch_steps, memory_limit):
+        self.budget = MemoryBudget(memory_limit)
+        self.futures = {}
+        self.reserved = {}
+        for steps in branch_steps:
+            if steps:
+                futures = [Future() for step in steps]
+                for (name, function, arguments), future in zip(steps, futures):
+                    self.futures[name] = future
+                get_executor().submit(self.run_steps, steps, futures)
+
+    def run_steps(self, steps, futures):
+        # The steps of one branch run in order, each sees the results of the ones before it
+        results = {}
+        for (name, function, arguments), future in zip(steps, futures):
+            if not future.set_running_or_notify_cancel():
+                return # The run has ended
+
+            def reserve(size, name=name):
+                if not self.budget.reserve(size):
+                    return False
+                self.reserved[name] = self.reserved.get(name, 0) + size
+                return True
+
+            try:
+                results[name] = function(results, reserve, *arguments)
+            except Exception as e:
+                print(f'Could not prepare {name} ahead: {str(e)}')
+                results[name] = None
+            future.set_result(results[name])
+
+    def get(self, name):
+        future = self.futures.pop(name, None)
+        if future is None:
+            return None
+        result = future.result()
+        self.budget.release(self.reserved.pop(name, 0))
+        return result
+
+    def cancel(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
@@ -20,8 +20,9 @@ import os
 import importlib
 import math
 import bpy
-import re
 import sys
+import time
+import json
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -35,52 +36,69 @@ spec = importlib.util.spec_from_file_location(module_name, module_path)
 nm = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(nm)
 
-def update_replacement_dictionary():
+# The core's plan and substitution modules, so there is one of each
+nco = nm.nco
+npl = nco.npl
+nsub = nco.nsub
 
-    bpy.context.scene.replacement_dictionary.clear()
-    bpy.context.scene.library_collection.clear()
-    bpy.context.scene.filepath_collection.clear()
+# The counters the add-on's modules report to
+npf = nm.npf
 
-    replacement_dictionary = get_replacement_dictionary()
+module_name = "NodeSchedule"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
 
-    for path in get_back_paths(get_start_node()):
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nsc = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nsc)
 
-        path_dictionary = {}
+module_name = "NodeDirty"
+module_file = module_name + ".py"
+module_path = os.path.join(current_dir, module_file)
 
-        for node in path:
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+nd = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nd)
 
-            if node.automation_type =='DCT': 
+# Changes whenever the dictionary is set, the expanded table is cached against it
+replacement_dictionary_version = 0
 
-                temporary_dicationary={}
-                var_folder = node.variable_folder
+def update_replacement_dictionary():
 
-                for i in range(len(var_folder)):
+    bpy.context.scene.replacement_dictionary.clear()
+    bpy.context.scene.library_collection.clear()
+    bpy.context.scene.filepath_collection.clear()
 
-                    temporary_dicationary[var_folder[i].variable] = var_folder[i].replacement
+    start_node = get_start_node()
+    plan = npl.get_plan(start_node)
+    replacement_dictionary, library_names, file_modules = nco.collect_definitions(plan, start_node.id_data.nodes)
 
-                temporary_dicationary = substitute_keys_into_values(path_dictionary, temporary_dicationary)
+    for library_name in library_names:
+        bpy.context.scene.library_collection.add().library_name = library_name
 
-                append_unique_keys(path_dictionary, temporary_dicationary)
+    for filepath_name, module_name in file_modules:
+        filepath_element = bpy.context.scene.filepath_collection.add()
+        filepath_element.filepath_name = filepath_name
+        filepath_element.module_name = module_name
 
-            elif node.automation_type == 'LIB':
+    set_replacement_dictionary(replacement_dictionary)
 
-                var_folder = node.variable_folder
+    # Import the libraries and files once for the whole run
+    nm.begin_evaluation_run()
 
-                for library in var_folder:
-                    bpy.context.scene.library_collection.add().library_name = library.library_name
-            
-            elif node.automation_type == 'FIM':
-                filepath_element = bpy.context.scene.filepath_collection.add()
-                filepath_element.filepath_name = node.filepath_name
-                filepath_element.module_name = node.module_name
+def run_to_end(steps):
+    # Runs a generator of steps without stopping and returns what it returns
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
 
-            elif node.automation_type != 'SRT':
-                print('Invalid Library or Dictionary Connection')
+def execute_node(node, prefetch=None):
+    return run_to_end(execute_node_steps(node, prefetch))
 
-        replacement_dictionary = append_unique_keys(replacement_dictionary, path_dictionary)
-        set_replacement_dictionary(replacement_dictionary)
-
-def execute_node(node):
+def execute_node_steps(node, prefetch=None):
+    # Yields the vertex count of every frame a Transform writes, returns 'BREAK' where a gate stops the run
 
     if bpy.context.scene.replacement_dictionary_is_updated:
         update_replacement_dictionary()
@@ -112,148 +130,151 @@ def execute_node(node):
                     nm.bpy_hide_selected_objects()
 
             case 'GRD':
-                evaluated_strings = nm.safe_evaluation(
-                    substitute_keys_into_strings(get_replacement_dictionary(), [
-                                        node.x_length,
-                                        node.y_length,
-                                        node.z_length,
-                                        node.x_offset,
-                                        node.y_offset,
-                                        node.z_offset,
-                                        node.cube_density_x,
-                                        node.cube_density_y,
-                                        node.cube_density_z,
-                                    ]))
-                
-                lengths_vector = evaluated_strings[0:3]
-                offset_vector = evaluated_strings[3:6]
-                cube_density_vector = evaluated_strings[6:9]
-                
-                nm.grid(lengths_vector, offset_vector, cube_density_vector)
-                
-                if node.is_hollow:
-                    nm.hollow_grid(offset_vector, lengths_vector, cube_density_vector)
+                arguments = grid_arguments(node)
+                arrays = prefetch.get(node.name) if prefetch else None
+                if arrays is None:
+                    arrays = nm.grid_arrays(*arguments[:-1])
+                nm.grid_object(arrays, arguments[-1])
 
             case 'TFM':
-                
-                variables = substitute_keys_into_strings(get_replacement_dictionary(),[
-                    node.x_equation,
-                    node.y_equation,
-                    node.z_equation,
-                ])
-
-                evaluated_strings = nm.safe_evaluation(
-                    substitute_keys_into_strings(get_replacement_dictionary(),[
-                                        node.animation_run_time,
-                                        node.frames_per_calculation,
-                                        node.repeats,
-                                    ]))
-                
-                equations_vector = variables[0:3]
-                animation_run_time = evaluated_strings[0]
-                frames_per_clculation = evaluated_strings[1]
-                repeats = evaluated_strings[2]
-                transformation_type = node.transformation_type
-                keep_option = node.keep_option
-
-                nm.transform(
-                    equations_vector,
-                    animation_run_time,
-                    frames_per_clculation,
-                    repeats,
-                    transformation_type,
-                    keep_option,
-                )
+                prefetched = prefetch.get(node.name) if prefetch else None
+                yield from nm.transform_steps(*transform_arguments(node), prefetched)
 
             case 'EXE':
                 final_execution_code = substitute_keys_into_strings(get_replacement_dictionary(), node.execution_code)
                 exec(final_execution_code)
 
-def substitute_keys_into_values(target, modifier):
-    # Result dictionary that will store updated key-value pairs
-    result = {}
-    
-    # Iterate through each key and value in dic2
-    for key, value in modifier.items():
-        # Initialize the modified value as the original value
-        modified_value = value
-        
-        # Check for each key in dic1 if it is a substring of the value in dic2
-        for sub_key, sub_value in target.items():
-            # Replace the occurrence of dic1's key in dic2's value
-            modified_value = modified_value.replace(sub_key, sub_value)
-        
-        # Store the modified value in the result dictionary
-        result[key] = modified_value
-    
-    return result
+def grid_arguments(node):
+    # The arguments of nm.grid for a Grid Create node, resolved on the main thread
+    transform_node = next((output for output in list_output_nodes(node) if getattr(output, 'automation_type', None) == 'TFM'), None)
+    return nco.grid_arguments(node, get_substitution_table(), nm.get_evaluation_context(), transform_node)
+
+def transform_arguments(node):
+    # The arguments of nm.transform for a Transform node, resolved on the main thread
+    return nco.transform_arguments(node, get_substitution_table(), nm.get_evaluation_context())
+
+def prefetch_transform(results, reserve, grid_name, arguments):
+    arrays = results.get(grid_name)
+    if arrays is None:
+        return None
+    equations_vector, animation_run_time, frames_per_calculation, repeats, transformation_type, keep_option, is_parallel, output_mode = arguments[:8]
+    is_adaptive = arguments[10]
+    if output_mode in ('LIVE', 'GEOMETRY_NODES') or is_adaptive or is_parallel:
+        return None
+    return nm.prefetch_transform_frames(arrays[0], equations_vector, animation_run_time, frames_per_calculation, transformation_type, reserve)
+
+def prefetch_grid(results, reserve, arguments):
+    return nm.grid_arrays(*arguments[:-1])
+
+def start_prefetch(plan, node_tree, use_cache):
+    # Grids, and the frames of a Transform that only follows a grid, are calculated on worker threads ahead
+    # of the main thread. A Transform uses its frames only if the object it reaches has exactly that grid.
+    branch_steps = []
+    for branch in nsc.find_branches(plan):
+        steps = []
+        prepared = set()
+        for name in branch:
+            node = node_tree.nodes[name]
+            automation_type = getattr(node, 'automation_type', None)
+            if use_cache and automation_type in nd.cached_types and any(nd.outputs_exist(record, signature) for signature, record in nd.get_records(node).items()):
+                continue # Likely reused, nothing to calculate
+            if automation_type == 'GRD':
+                steps.append((name, prefetch_grid, (grid_arguments(node),)))
+                prepared.add(name)
+            elif automation_type == 'TFM' and len(plan.predecessors[name]) == 1 and plan.predecessors[name][0] in prepared:
+                steps.append((name, prefetch_transform, (plan.predecessors[name][0], transform_arguments(node))))
+        branch_steps.append(steps)
+    return nsc.Prefetch(branch_steps, nm.prefetch_memory_limit)
 
 def execute_all_paths(start_node):
-    def run_path(input_node):
-        for node in list_output_nodes(input_node):
-            return_value = execute_node(node) # An if statement node might break this loop
-            if return_value != 'BREAK':
-                run_path(node) # It will travel down 1111 then 1112 then 1121 ...
-    run_path(start_node)
-
-def get_forward_paths(start_node):
-    def visit(node, path):
-        # If the node is already in the path, this path forms a loop. Return the path up to the current node.
-        if node in path:
-            return [path + [node]]
-
-        # Extend the current path by including the current node
-        extended_path = path + [node]
-        paths = []  # This will collect all paths originating from this node
-
-        # Check if the current node has outputs and they are linked to other nodes
-        outputs = [output for output in node.outputs if output.is_linked]
-        
-        if outputs:
-            # If outputs exist, recurse for each linked node
-            for output in outputs:
-                for link in output.links:
-                    linked_node = link.to_node
-                    paths.extend(visit(linked_node, extended_path))
-        else:
-            # If no outputs are linked, this is a terminal node. End this path here.
-            paths.append(extended_path)
+    run_to_end(execute_all_paths_steps(start_node))
+
+def relay_frames(steps, progress, profile):
+    # Passes the frames a node reports on to the progress of the run and returns the node's result. The node's
+    # measurement is suspended while the caller has the run, so only the node's own work is measured.
+    try:
+        while True:
+            try:
+                vertices = next(steps)
+            except StopIteration as stop:
+                return stop.value
+            progress.add_frame(vertices)
+            profile.suspend()
+            yield progress
+            profile.resume()
+    finally:
+        steps.close()
+
+def execute_all_paths_steps(start_node):
+    # Runs the tree one node, or one Transform frame, at a time and yields the progress after each. Closing the
+    # generator stops the run: the node it was in cleans up and the finished nodes are recorded.
+
+    # Every node's time, work and memory, shown on the Start node afterwards
+    profile = npf.RunProfile(getattr(start_node, 'is_profiled', False))
 
-        return paths
+    if bpy.context.scene.replacement_dictionary_is_updated:
+        with profile.measure('Dictionaries and Imports', 'DCT'):
+            update_replacement_dictionary()
+        bpy.context.scene.replacement_dictionary_is_updated = False
 
-    # Start the recursive visitation from the start_node
-    return visit(start_node, [])
+    use_cache = getattr(start_node, 'use_cache', False)
+    run_state = nd.new_run_state(use_cache)
+    run_nonce = time.time()
 
-def get_back_paths(start_node):
-    def visit(node, path):
-        # If the node is already in the path, this path forms a loop. Return the path up to the current node.
-        if node in path:
-            return [path + [node]]
+    plan = npl.get_plan(start_node)
+    node_tree = start_node.id_data
+    prefetch = start_prefetch(plan, node_tree, use_cache) if getattr(start_node, 'is_concurrent', False) else None
+    progress = npf.RunProgress(len(plan.order))
 
-        # Extend the current path by including the current node at the beginning
-        extended_path = [node] + path
-        paths = []  # This will collect all paths leading to this node
+    # Nodes that ran and let the run continue past them, with the signature each one passes on
+    signatures = {start_node.name: nd.run_signature(get_replacement_dictionary(), bpy.context.scene.library_collection, bpy.context.scene.filepath_collection)}
 
-        # Check if the current node has inputs and they are linked from other nodes
-        inputs = [input for input in node.inputs if input.is_linked]
-        
-        if inputs:
-            # If inputs exist, recurse for each linked node
-            for input in inputs:
-                for link in input.links:
-                    linked_node = link.from_node
-                    if node.automation_type == 'GAT':
-                        if not node.allowed_to_pass:
-                            break
-                    paths.extend(visit(linked_node, extended_path))
-        else:
-            # If no inputs are linked, this is a starting node. Begin this path here.
-            paths.append(extended_path)
+    # Undo and scene updates wait until the run is over
+    with nm.suspended_updates():
+        try:
+            for name in plan.order:
+
+                upstream = [signatures[predecessor] for predecessor in plan.predecessors[name] if predecessor in signatures]
+                if not upstream:
+                    progress.finish_node()
+                    continue # Every node linking into this one was stopped by a gate
+
+                node = node_tree.nodes[name]
+                progress.begin_node(name)
+
+                with profile.measure(name, getattr(node, 'automation_type', None)) as entry:
+                    signature = nd.node_signature(node, upstream[0] if len(upstream) == 1 else nd.make_signature(*upstream), run_nonce)
+                    record = nd.find_reusable(node, signature) if use_cache else None
 
-        return paths
+                    if record is not None:
+                        # Nothing this node depends on changed since its objects were made
+                        nd.restore_outputs(node, signature, record, run_state)
+                        entry['reused'] = True
+                        return_value = None
+                    else:
+                        names_before = nd.object_names()
+                        return_value = yield from relay_frames(execute_node_steps(node, prefetch), progress, profile) # A gate node might stop the run here
+                        nd.record_outputs(node, signature, names_before, run_state)
 
-    # Start the recursive visitation from the start_node
-    return visit(start_node, [])
+                if return_value != 'BREAK':
+                    signatures[name] = signature
+
+                progress.finish_node()
+                yield progress
+
+        finally:
+            if prefetch is not None:
+                prefetch.cancel()
+
+            nd.save_records(node_tree, run_state)
+
+            # The pooled arrays are as large as the biggest object of the run, no need to hold them in between
+            nm.nb.clear_buffers()
+
+            start_node.run_report = json.dumps(profile.report())
+            if profile.is_profiled:
+                directory = profile.write(bpy.path.abspath(start_node.profile_directory))
+                print('Node Form profile written to ' + directory)
 
 def list_output_nodes(input_node):
     
@@ -269,33 +290,14 @@ def list_output_nodes(input_node):
     return output_nodes
 
 def substitute_keys_into_strings(modifying_dictionary, strings):
-    # Flag to check if the input was a single string
-    single_string_input = False
-    
-    # Check if the input is a single string and convert it to a list if so
-    if isinstance(strings, str):
-        strings = [strings]
-        single_string_input = True
+    # The current dictionary keeps its pattern, any other dictionary's pattern is cached by its keys
+    table = nsub.table
+    pattern = table.pattern if modifying_dictionary is table.resolved else nsub.get_pattern(modifying_dictionary)
 
-    # List to store the modified strings
-    modified_strings = []
-
-    # Create a regular expression that matches any of the keys in the dictionary
-    regex_pattern = re.compile("|".join(map(re.escape, modifying_dictionary.keys())))
-
-    # Iterate over each string in the input list
-    for s in strings:
-        # Use re.sub to replace all matches at once
-        modified_s = regex_pattern.sub(lambda match: modifying_dictionary[match.group(0)], s)
-        
-        # Add the modified string to the list
-        modified_strings.append(modified_s)
+    if isinstance(strings, str):
+        return nsub.substitute(modifying_dictionary, strings, pattern)
 
-    # Return the appropriate type based on the input
-    if single_string_input:
-        return modified_strings[0]
-    else:
-        return modified_strings
+    return [nsub.substitute(modifying_dictionary, s, pattern) for s in strings]
 
 def get_node_form_tree():
 
@@ -321,33 +323,33 @@ def get_start_node():
             print('no start node found')
             return None
 
-def append_unique_keys(target, appendage):
-    
-    for key, value in appendage.items():
-        # Add to target only if key is not already in target
-        if key not in target:
-            target[key] = value
-        else:
-            print("WARNING: You have more than one definition for: \"" + key + "\"")
-    return target
+def dictionary_version():
+    scene = bpy.context.scene
+    return (scene.as_pointer(), replacement_dictionary_version, len(scene.replacement_dictionary))
 
-def get_replacement_dictionary():
+def read_replacement_dictionary():
+    return {element.variable: element.replacement for element in bpy.context.scene.replacement_dictionary}
 
-    return_dictionary={}
-    replacement_dictionary = bpy.context.scene.replacement_dictionary
-    
-    for i in range(len(replacement_dictionary)):
-        variable = replacement_dictionary[i].variable
-        replacement = replacement_dictionary[i].replacement
-        return_dictionary[variable] = replacement
+def get_substitution_table():
+    return nsub.get_table(dictionary_version(), read_replacement_dictionary)
 
-    return return_dictionary
+def get_replacement_dictionary():
+    # Fully expanded and shared until the dictionary is set again, do not modify the result
+    return get_substitution_table().resolved
 
 def set_replacement_dictionary(dictionary):
-    bpy.context.scene.replacement_dictionary.clear()
-    i = 0
-    for key in dictionary:
-        bpy.context.scene.replacement_dictionary.add()
-        bpy.context.scene.replacement_dictionary[i].variable = key
-        bpy.context.scene.replacement_dictionary[i].replacement = dictionary[key]
-        i += 1
+    global replacement_dictionary_version
+
+    # The definitions were expanded against their upstream dictionaries when they were collected
+    table = nsub.SubstitutionTable(dictionary)
+
+    replacement_dictionary = bpy.context.scene.replacement_dictionary
+    replacement_dictionary.clear()
+    for key, value in table.resolved.items():
+        element = replacement_dictionary.add()
+        element.variable = key
+        element.replacement = value
+
+    replacement_dictionary_version += 1
+    nsub.table = table
+    nsub.table_version = dictionary_version()
@@ -0,0 +1,71 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import re
+
+# Compiled patterns by the set of keys they match, so a pattern is built once per dictionary
+patterns = {}
+pattern_cache_size = 64
+
+def get_pattern(keys):
+    keys = frozenset(keys)
+    if keys not in patterns:
+        if len(patterns) >= pattern_cache_size:
+            patterns.clear()
+        # Longest keys first, so a key wins over a shorter key it starts with
+        ordered = sorted(keys, key=lambda key: (-len(key), key))
+        patterns[keys] = re.compile('|'.join(map(re.escape, ordered))) if ordered else None
+    return patterns[keys]
+
+def substitute(dictionary, text, pattern=None):
+    # Replaces every key in one pass over the text, replacements are not searched again
+    pattern = pattern or get_pattern(dictionary)
+    if pattern is None:
+        return text
+    return pattern.sub(lambda match: dictionary[match.group(0)], text)
+
+def substitute_within(dictionary, text, pattern):
+    # pattern may match keys besides those of dictionary, so one pattern serves many dictionaries with shared
+    # keys. Only a text in which it matches a key missing from dictionary needs the dictionary's own pattern.
+    if any(key not in dictionary for key in pattern.findall(text)):
+        return substitute(dictionary, text)
+    return pattern.sub(lambda match: dictionary[match.group(0)], text)
+
+class SubstitutionTable:
+
+    # A dictionary and its prebuilt pattern. The definitions come already expanded, each dictionary against
+    # the dictionaries upstream of it (collect_definitions), and are stored as they are: expanding them again
+    # would let a key rewrite the text of another key's replacement.
+    def __init__(self, definitions):
+        self.resolved = dict(definitions)
+        self.pattern = get_pattern(self.resolved)
+
+    def substitute(self, text):
+        return substitute(self.resolved, text, self.pattern)
+
+# The table of the current dictionary and the version it was built for
+table_version = None
+table = SubstitutionTable({})
+
+def get_table(version, load_definitions):
+    # load_definitions is only called when the version changed since the table was last built
+    global table_version, table
+    if version != table_version:
+        table = SubstitutionTable(load_definitions())
+        table_version = version
+    return table
@@ -0,0 +1,328 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+# Times the hot paths of Node Form at growing sizes and writes the results as JSON.
+#
+#   python benchmarks/run.py --output results.json
+#   python benchmarks/run.py --compare baseline.json
+#   python benchmarks/run.py --compare baseline.json --results results.json
+#   blender --background --factory-startup --python benchmarks/run.py -- --output blender.json
+#
+# Outside Blender the add-on runs against the stand-in in stand_in.py. Inside Blender it runs against the real
+# bpy, and the full transform() with shape keys is timed as well.
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import importlib.util
+import numpy as np
+
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+current_dir = os.path.dirname(benchmark_dir)
+
+# Construct the path to the module you want to import
+module_name = "stand_in"  # Name of the module you want to import
+module_file = module_name + ".py"
+module_path = os.path.join(benchmark_dir, module_file)
+
+# Load the module
+spec = importlib.util.spec_from_file_location(module_name, module_path)
+si = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(si)
+
+is_stand_in = si.install()
+
+if is_stand_in:
+    module_name = "NodeSearch"
+    module_file = module_name + ".py"
+    module_path = os.path.join(current_dir, module_file)
+
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    ns = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ns)
+else:
+    # The scene properties the add-on reads only exist once its classes are registered
+    module_name = "NodeGroups"
+    module_file = module_name + ".py"
+    module_path = os.path.join(current_dir, module_file)
+
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    ng = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ng)
+    ng.register_ng()
+    ns = ng.ns
+
+import bpy
+
+nm = ns.nm
+nco = ns.nco
+ne = nco.ne
+
+class Case:
+
+    def __init__(self, name, params, run, setup=None):
+        self.name = name
+        self.params = params
+        self.run = run
+        self.setup = setup
+
+    def key(self):
+        return ' '.join([self.name] + [f'{name}={value}' for name, value in self.params.items()])
+
+def set_libraries(library_names):
+    scene = bpy.context.scene
+    scene.library_collection.clear()
+    for library_name in library_names:
+        scene.library_collection.add().library_name = library_name
+    scene.filepath_collection.clear()
+    nm.begin_evaluation_run()
+
+def synthetic_dictionary(size):
+    # Every key after the first refers to the key at half its index, so definitions nest about log2(size) deep
+    definitions = {'[k0]': '1.5'}
+    for index in range(1, size):
+        definitions[f'[k{index}]'] = f'([k{index // 2}]+{index})'
+    return definitions
+
+def substitution_cases(quick):
+    equations = None
+    for size in (10, 100, 1000) if quick else (10, 100, 1000, 10000):
+        definitions = synthetic_dictionary(size)
+        equations = [' + '.join(f'[k{(index * 7 + term) % size}]*[x]' for term in range(8)) for index in range(1000)]
+        yield Case('resolve', {'keys': size}, lambda definitions=definitions: ns.set_replacement_dictionary(definitions))
+        yield Case(
+            'substitute', {'keys': size, 'strings': len(equations)},
+            lambda equations=equations: ns.substitute_keys_into_strings(ns.get_replacement_dictionary(), equations),
+            lambda definitions=definitions: ns.set_replacement_dictionary(definitions),
+        )
+
+def evaluation_cases(quick):
+    def evaluate(calls):
+        for index in range(calls):
+            nm.safe_evaluation('math.sin([x])*[y]+[z]**2', index * 0.001, 0.5, 2.0)
+
+    def evaluate_strings(count):
+        nm.safe_evaluation([f'{index}*math.pi/{count}' for index in range(count)])
+
+    for calls in (1000, 10000) if quick else (1000, 10000, 100000):
+        yield Case('safe_evaluation', {'calls': calls}, lambda calls=calls: evaluate(calls), lambda: set_libraries(['math']))
+        yield Case('safe_evaluation_list', {'strings': calls}, lambda calls=calls: evaluate_strings(calls), lambda: set_libraries(['math']))
+
+def synthetic_tree(size):
+    # A chain of dictionaries into the Start node and a chain of Select nodes after it, with a branch leaving
+    # and merging back every tenth node
+    nodes = {'Start': {'automation_type': 'SRT'}}
+    links = []
+    for index in range(size):
+        nodes[f'Dictionary {index}'] = {'automation_type': 'DCT', 'variable_folder': [{'variable': f'[d{index}]', 'replacement': f'[d{index - 1}]+1' if index else '1'}]}
+        links.append([f'Dictionary {index}', f'Dictionary {index + 1}' if index + 1 < size else 'Start'])
+
+    previous = 'Start'
+    for index in range(size):
+        nodes[f'Select {index}'] = {'automation_type': 'SLT'}
+        links.append([previous, f'Select {index}'])
+        if index % 10 == 0 and index >= 10:
+            nodes[f'Branch {index}'] = {'automation_type': 'SLT'}
+            links.append([f'Select {index - 10}', f'Branch {index}'])
+            links.append([f'Branch {index}', f'Select {index}'])
+        previous = f'Select {index}'
+    return {'nodes': nodes, 'links': links}
+
+def plan_cases(quick):
+    # The execution plan replaced get_forward_paths and get_back_paths, it orders both sides of the Start node
+    for size in (10, 100, 1000) if quick else (10, 100, 1000, 10000):
+        tree = nco.Tree(synthetic_tree(size))
+
+        def plan(tree=tree):
+            execution_plan = tree.plan()
+            nco.collect_definitions(execution_plan, tree.nodes)
+
+        yield Case('plan', {'nodes': len(tree.nodes)}, plan)
+
+def grid_cases(quick):
+    for density in (2, 4, 8, 16) if quick else (2, 4, 8, 16, 32, 64):
+        yield Case('grid', {'density': density}, lambda density=density: nm.grid((1, 1, 1), (0, 0, 0), (density, density, density)), si.reset)
+
+transform_equations = ['[x]*math.cos([t])', '[y]+math.sin([x]*[t])', '[z]']
+
+def bake_cases(quick):
+    # The frame loop of transform(), every frame evaluated into the same buffer as the shape key output does
+    vertex_counts = (10**3, 10**4, 10**5) if quick else (10**3, 10**4, 10**5, 10**6)
+    frame_counts = (1, 10, 100) if quick else (1, 10, 100, 500)
+
+    def bake(basis, frames):
+        vector_kernel = nm.get_evaluation_context().vector_kernel(transform_equations)
+        frame_parameters = nco.transform_frame_parameters(frames - 1, 1, 24, 0.0, True)
+        out = np.empty(basis.shape, dtype=np.float32)
+        scratch = np.empty(basis.shape, dtype=np.float64)
+        for frame_index, coordinates in ne.bake_frames(vector_kernel, basis, frame_parameters, out, scratch):
+            pass
+
+    for vertices in vertex_counts:
+        basis = np.random.default_rng(0).random((vertices, 3))
+        for frames in frame_counts:
+            yield Case('bake', {'vertices': vertices, 'frames': frames}, lambda basis=basis, frames=frames: bake(basis, frames), lambda: set_libraries(['math']))
+
+def transform_cases(quick):
+    # The whole transform() with shape keys, which needs the real bpy. Runs that would hold more than
+    # shape_key_limit coordinates in shape keys are left out.
+    if is_stand_in:
+        return
+    shape_key_limit = 5 * 10**7
+    vertex_counts = (10**3, 10**4, 10**5) if quick else (10**3, 10**4, 10**5, 10**6)
+    frame_counts = (1, 10, 100) if quick else (1, 10, 100, 500)
+
+    def point_cloud(vertices):
+        si.reset()
+        set_libraries(['math'])
+        mesh = bpy.data.meshes.new("Mesh")
+        points = np.random.default_rng(0).random((vertices, 3))
+        nm.nb.fill_mesh(mesh, points, np.empty((0, 2), dtype=np.int32), np.empty((0, 4), dtype=np.int32))
+        obj = bpy.data.objects.new("Mesh", mesh)
+        bpy.context.collection.objects.link(obj)
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+
+    for vertices in vertex_counts:
+        for frames in frame_counts:
+            if vertices * frames > shape_key_limit:
+                continue
+            run_time = (frames - 1) / 24
+            yield Case(
+                'transform', {'vertices': vertices, 'frames': frames},
+                lambda run_time=run_time: nm.transform(transform_equations, run_time, 1, 0, 'REGULAR', 'DELETE'),
+                lambda vertices=vertices: point_cloud(vertices),
+            )
+
+suites = {
+    'substitution': substitution_cases,
+    'evaluation': evaluation_cases,
+    'plan': plan_cases,
+    'grid': grid_cases,
+    'bake': bake_cases,
+    'transform': transform_cases,
+}
+
+def measure(case, repeat):
+    times = []
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup()
+        start = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter() - start)
+    return {
+        'name': case.name,
+        'params': case.params,
+        'best': min(times),
+        'median': statistics.median(times),
+        'repeat': repeat,
+    }
+
+def run_suites(names, quick, repeat):
+    results = {}
+    for name in names:
+        for case in suites[name](quick):
+            result = measure(case, repeat)
+            results[case.key()] = result
+            print(f'{case.key():48s} {result["best"] * 1000:12.3f} ms')
+    if is_stand_in:
+        si.reset()
+    return {
+        'mode': 'stand-in' if is_stand_in else 'blender',
+        'blender': None if is_stand_in else bpy.app.version_string,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'quick': quick,
+        'results': results,
+    }
+
+def compare(baseline, current, threshold):
+    # Prints the ratio of the best times of every case in both runs, returns whether any got slower
+    if baseline.get('mode') != current.get('mode'):
+        print(f'Warning: comparing a {baseline.get("mode")} run with a {current.get("mode")} run')
+
+    regressed = False
+    for key, result in current['results'].items():
+        before = baseline['results'].get(key)
+        if before is None:
+            print(f'{key:48s} {"":>12s} {result["best"] * 1000:12.3f} ms  new')
+            continue
+        ratio = result['best'] / before['best'] if before['best'] > 0 else float('inf')
+        verdict = ''
+        if ratio > 1 + threshold:
+            verdict = 'slower'
+            regressed = True
+        elif ratio < 1 - threshold:
+            verdict = 'faster'
+        print(f'{key:48s} {before["best"] * 1000:12.3f} ms {result["best"] * 1000:12.3f} ms {ratio:7.2f}x  {verdict}')
+
+    for key in baseline['results']:
+        if key not in current['results']:
+            print(f'{key:48s} missing')
+    return regressed
+
+def parse_arguments():
+    # Blender passes the script's own arguments after '--'
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description='Time the hot paths of Node Form')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare with the results in this JSON file')
+    parser.add_argument('--results', help='compare these saved results instead of running the benchmarks')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative change reported as slower or faster')
+    parser.add_argument('--only', default=','.join(suites), help='comma separated suites: ' + ', '.join(suites))
+    parser.add_argument('--repeat', type=int, default=3, help='runs of every case, the best is reported')
+    parser.add_argument('--quick', action='store_true', help='leave out the largest sizes')
+    return parser.parse_args(argv)
+
+def main():
+    arguments = parse_arguments()
+
+    if arguments.results:
+        with open(arguments.results) as file:
+            current = json.load(file)
+    else:
+        names = [name.strip() for name in arguments.only.split(',') if name.strip()]
+        unknown = [name for name in names if name not in suites]
+        if unknown:
+            print('Unknown suites: ' + ', '.join(unknown))
+            return 2
+        current = run_suites(names, arguments.quick, arguments.repeat)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(current, file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+        return 1 if compare(baseline, current, arguments.threshold) else 0
+    return 0
+
+if __name__ == '__main__':
+    status = main()
+    if not is_stand_in:
+        ng.unregister_ng()
+    sys.exit(status)
@@ -0,0 +1,193 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+# Just enough of bpy for the add-on's modules to load and for grid() to build a mesh.
+# Data written with foreach_set is kept as a copy, so the cost of handing arrays over is still measured.
+
+import sys
+import types
+import numpy as np
+
+class DataCollection:
+
+    # mesh.vertices, mesh.edges, mesh.loops and mesh.polygons
+    def __init__(self):
+        self.length = 0
+        self.values = {}
+
+    def __len__(self):
+        return self.length
+
+    def add(self, count):
+        self.length += count
+
+    def foreach_set(self, name, data):
+        self.values[name] = np.array(data, copy=True)
+
+    def foreach_get(self, name, out):
+        out[...] = self.values[name].reshape(out.shape)
+
+class Mesh:
+
+    def __init__(self, name):
+        self.name = name
+        self.vertices = DataCollection()
+        self.edges = DataCollection()
+        self.loops = DataCollection()
+        self.polygons = DataCollection()
+        self.shape_keys = None
+
+    def update(self):
+        pass
+
+class Object:
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self.type = 'MESH'
+        self.selected = False
+        self.hidden = False
+        self.properties = {}
+
+    # Custom properties, obj['name']
+    def __getitem__(self, name):
+        return self.properties[name]
+
+    def __setitem__(self, name, value):
+        self.properties[name] = value
+
+    def get(self, name, default=None):
+        return self.properties.get(name, default)
+
+    def select_set(self, state):
+        self.selected = state
+
+    def hide_set(self, state):
+        self.hidden = state
+
+class IDCollection:
+
+    # bpy.data.meshes and bpy.data.objects
+    def __init__(self, factory):
+        self.factory = factory
+        self.items = {}
+
+    def new(self, name, *arguments):
+        item = self.factory(name, *arguments)
+        self.items[name if name not in self.items else f'{name}.{len(self.items):03d}'] = item
+        return item
+
+    def remove(self, item, do_unlink=True):
+        self.items = {name: value for name, value in self.items.items() if value is not item}
+
+    def get(self, name):
+        return self.items.get(name)
+
+    def clear(self):
+        self.items.clear()
+
+    def __iter__(self):
+        return iter(list(self.items.values()))
+
+    def keys(self):
+        return list(self.items.keys())
+
+    def __getitem__(self, name):
+        return self.items[name]
+
+    def __contains__(self, name):
+        return name in self.items
+
+class PropertyCollection(list):
+
+    # A CollectionProperty: add() appends a new element whose fields are set afterwards
+    def add(self):
+        element = types.SimpleNamespace()
+        self.append(element)
+        return element
+
+class Scene:
+
+    def __init__(self):
+        self.replacement_dictionary = PropertyCollection()
+        self.replacement_dictionary_is_updated = False
+        self.library_collection = PropertyCollection()
+        self.filepath_collection = PropertyCollection()
+        self.frame_start = 0
+        self.frame_end = 250
+
+    def as_pointer(self):
+        return id(self)
+
+def install():
+    # Registers the stand-in modules, unless a real bpy can be imported
+    try:
+        import bpy
+        return False
+    except ImportError:
+        pass
+
+    bpy = types.ModuleType('bpy')
+    bpy.data = types.SimpleNamespace(meshes=IDCollection(Mesh), objects=IDCollection(Object), node_groups=IDCollection(lambda name, kind: None))
+
+    view_layer = types.SimpleNamespace(objects=types.SimpleNamespace(active=None))
+    collection = types.SimpleNamespace(objects=types.SimpleNamespace(link=lambda obj: None))
+
+    class Context:
+        scene = Scene()
+
+        @property
+        def selected_objects(self):
+            return [obj for obj in bpy.data.objects if obj.selected]
+
+        @property
+        def active_object(self):
+            return view_layer.objects.active
+
+    Context.view_layer = view_layer
+    Context.collection = collection
+    Context.preferences = types.SimpleNamespace(edit=types.SimpleNamespace(use_global_undo=True))
+    bpy.context = Context()
+
+    bpy.path = types.SimpleNamespace(abspath=lambda path: path, clean_name=lambda name: name)
+    bpy.utils = types.SimpleNamespace(escape_identifier=lambda name: name.replace('\\', '\\\\').replace('"', '\\"'))
+
+    handlers = types.ModuleType('bpy.app.handlers')
+    handlers.persistent = lambda function: function
+    handlers.frame_change_pre = []
+    handlers.load_pre = []
+    handlers.load_post = []
+    app = types.ModuleType('bpy.app')
+    app.handlers = handlers
+    bpy.app = app
+
+    sys.modules.update({
+        'bpy': bpy,
+        'bpy.app': app,
+        'bpy.app.handlers': handlers,
+    })
+    return True
+
+def reset():
+    # Removes everything the previous benchmark made, in the stand-in and in Blender alike
+    import bpy
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
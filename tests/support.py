@@ -0,0 +1,39 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+import os
+import sys
+import importlib.util
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load(module_name):
+    # The add-on's modules are loaded from their files, the same way they load each other
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(package_dir, module_name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def install_stand_in():
+    # The bpy stand-in of the benchmarks, for the modules that need bpy
+    benchmarks_dir = os.path.join(package_dir, 'benchmarks')
+    if benchmarks_dir not in sys.path:
+        sys.path.insert(0, benchmarks_dir)
+    import stand_in
+    stand_in.install()
+    return stand_in
@@ -0,0 +1,68 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+
+# The shape key keyframes written in one go per F-curve
+
+import types
+import support
+
+stand_in = support.install_stand_in()
+na = support.load('NodeAnimation')
+
+class FCurve:
+
+    def __init__(self, data_path):
+        self.data_path = data_path
+        self.keyframe_points = stand_in.DataCollection()
+
+    def update(self):
+        pass
+
+class FCurves(dict):
+
+    def find(self, data_path):
+        return self.get(data_path)
+
+    def new(self, data_path):
+        self[data_path] = FCurve(data_path)
+        return self[data_path]
+
+class ShapeKeys(dict):
+
+    # Key datablock with an action and its custom properties
+    def __init__(self):
+        self.name = 'Key'
+        self.animation_data = types.SimpleNamespace(action=types.SimpleNamespace(fcurves=FCurves()))
+
+def write(is_linear):
+    shape_keys = ShapeKeys()
+    writer = na.ShapeKeyAnimationWriter(shape_keys, is_linear)
+    key_block = types.SimpleNamespace(name='Key 0.0', value=0.0)
+    for frame, value in ((0, 1.0), (40, 0.0)):
+        writer.insert(key_block, frame, value)
+    writer.flush()
+    return shape_keys.animation_data.action.fcurves.find(na.shape_key_data_path('Key 0.0')).keyframe_points
+
+def test_adaptive_keys_interpolate_linearly():
+    keyframe_points = write(True)
+    assert list(keyframe_points.values['co']) == [0.0, 1.0, 40.0, 0.0]
+    assert list(keyframe_points.values['interpolation']) == [na.linear_interpolation] * 2
+
+def test_other_keys_keep_the_default_interpolation():
+    assert 'interpolation' not in write(False).values
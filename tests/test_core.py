@@ -0,0 +1,203 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+
+# The engine without Blender: plans, dictionaries, expressions and whole runs of a tree description, checked
+# against the plain per-vertex evaluation the add-on started from
+
+import math
+import numpy as np
+import support
+
+nco = support.load('NodeCore')
+ne = nco.ne
+nsub = nco.nsub
+nx = ne.nx
+
+def per_vertex_frames(vertices, equations, run_time, frames_per_calculation):
+    # Every frame of a REGULAR Transform, one vertex and one equation at a time with eval
+    upper_range = int(math.floor(run_time * 24 / frames_per_calculation))
+    T = upper_range * frames_per_calculation / 24
+    frames = []
+    for frame_index in range(upper_range + 1):
+        t = frame_index * frames_per_calculation / 24
+        frames.append([[eval(ne.tokens_to_names(equation), {'math': math}, {'_x': x, '_y': y, '_z': z, '_t': t, '_T': T}) for equation in equations] for x, y, z in vertices])
+    return np.array(frames)
+
+def tree(nodes, links):
+    return nco.Tree({'nodes': nodes, 'links': links})
+
+def test_run_tree_matches_per_vertex_evaluation():
+    equations = ['[x]+[t]', '[y]*2', '[z]+math.sin([x]*[T])']
+    scene = nco.run_tree(tree({
+        'Library': {'automation_type': 'LIB', 'variable_folder': [{'library_name': 'math'}]},
+        'Start': {'automation_type': 'SRT'},
+        'Grid': {'automation_type': 'GRD', 'cube_density_x': '3'},
+        'Transform': {'automation_type': 'TFM', 'x_equation': equations[0], 'y_equation': equations[1], 'z_equation': equations[2],
+                      'animation_run_time': '1', 'frames_per_calculation': '6'},
+    }, [['Library', 'Start'], ['Start', 'Grid'], ['Grid', 'Transform']]))
+
+    [obj] = scene.objects.values()
+    assert list(obj.positions()) == [0.0, 6.0, 12.0, 18.0, 24.0]
+    assert scene.frame_end == 24
+    expected = per_vertex_frames(obj.vertices.astype(np.float64), equations, 1, 6)
+    np.testing.assert_allclose(obj.coordinates(), expected, rtol=1e-5, atol=1e-5)
+
+def test_repeats_continue_from_the_last_key():
+    scene = nco.run_tree(tree({
+        'Start': {'automation_type': 'SRT'},
+        'Grid': {'automation_type': 'GRD'},
+        'Transform': {'automation_type': 'TFM', 'z_equation': '[z]+1', 'animation_run_time': '1', 'frames_per_calculation': '12', 'repeats': '1'},
+    }, [['Start', 'Grid'], ['Grid', 'Transform']]))
+
+    [obj] = scene.objects.values()
+    assert list(obj.positions()) == [0.0, 12.0, 24.0, 36.0, 48.0]
+    np.testing.assert_allclose(obj.coordinates()[-1][:, 2], obj.vertices[:, 2] + 2)
+
+def test_closed_gate_stops_the_nodes_after_it():
+    nodes = {
+        'Start': {'automation_type': 'SRT'},
+        'Gate': {'automation_type': 'GAT'},
+        'Grid': {'automation_type': 'GRD'},
+    }
+    assert nco.run_tree(tree(nodes, [['Start', 'Gate'], ['Gate', 'Grid']])).objects == {}
+    nodes['Gate']['allowed_to_pass'] = True
+    assert len(nco.run_tree(tree(nodes, [['Start', 'Gate'], ['Gate', 'Grid']])).objects) == 1
+
+def test_plan_runs_merges_after_all_their_inputs():
+    plan = tree({
+        'Start': {'automation_type': 'SRT'},
+        'A': {'automation_type': 'GRD'},
+        'B': {'automation_type': 'GRD'},
+        'C': {'automation_type': 'GRD'},
+        'Merge': {'automation_type': 'TFM'},
+        'Unreached': {'automation_type': 'GRD'},
+    }, [['Start', 'A'], ['Start', 'B'], ['A', 'C'], ['C', 'Merge'], ['B', 'Merge']]).plan()
+
+    assert sorted(plan.order) == ['A', 'B', 'C', 'Merge']
+    for name in plan.order:
+        assert all(plan.order.index(predecessor) < plan.order.index(name) for predecessor in plan.predecessors[name] if predecessor != 'Start')
+    assert plan.order[:2] == ['A', 'C']
+
+def test_collect_definitions_expands_upstream_dictionaries():
+    description = tree({
+        'Base': {'automation_type': 'DCT', 'variable_folder': [{'variable': 'a', 'replacement': '2'}]},
+        'Derived': {'automation_type': 'DCT', 'variable_folder': [{'variable': 'b', 'replacement': 'a*3'}]},
+        'Closed': {'automation_type': 'GAT'},
+        'Hidden': {'automation_type': 'DCT', 'variable_folder': [{'variable': 'c', 'replacement': '4'}]},
+        'Library': {'automation_type': 'LIB', 'variable_folder': [{'library_name': 'math'}]},
+        'File': {'automation_type': 'FIM', 'filepath_name': '//module.py', 'module_name': 'module'},
+        'Start': {'automation_type': 'SRT'},
+    }, [['Base', 'Derived'], ['Derived', 'Start'], ['Hidden', 'Closed'], ['Closed', 'Start'], ['Library', 'Start'], ['File', 'Start']])
+
+    definitions, library_names, file_modules = nco.collect_definitions(description.plan(), description.nodes)
+    assert definitions == {'a': '2', 'b': '2*3'}
+    assert library_names == ['math']
+    assert file_modules == [('//module.py', 'module')]
+
+def test_single_letter_keys_leave_other_replacements_alone():
+    description = tree({
+        'Default': {'automation_type': 'DCT', 'variable_folder': [{'variable': 'sin', 'replacement': 'math.sin'}, {'variable': '[e]', 'replacement': 'math.exp'}]},
+        'User': {'automation_type': 'DCT', 'variable_folder': [{'variable': 'a', 'replacement': '2'}, {'variable': 'e', 'replacement': '2.7'}, {'variable': 'w', 'replacement': 'sin(a)'}]},
+        'Start': {'automation_type': 'SRT'},
+    }, [['Default', 'User'], ['User', 'Start']])
+
+    definitions, library_names, file_modules = nco.collect_definitions(description.plan(), description.nodes)
+    assert definitions == {'sin': 'math.sin', '[e]': 'math.exp', 'a': '2', 'e': '2.7', 'w': 'math.sin(a)'}
+    table = nsub.SubstitutionTable(definitions)
+    assert table.substitute('sin([x])*[e]([t])') == 'math.sin([x])*math.exp([t])'
+
+def test_table_keeps_stored_definitions():
+    definitions = {'sin': 'math.sin', '[e]': 'math.exp', 'e': '2.7', 'a': '2'}
+    table = nsub.SubstitutionTable(nsub.SubstitutionTable(definitions).resolved)
+    assert table.resolved == definitions
+
+def test_substitution_prefers_the_longest_key():
+    table = nsub.SubstitutionTable({'r': '1', 'radius': '5'})
+    assert table.substitute('radius*r') == '5*1'
+
+def test_expression_graph_folds_constants_and_shares_terms():
+    graph = nx.build_graph(['math.sin(_x)*(2*3) + _y**2', 'math.sin(_x) + math.pi'], {'math': math}, ['_x', '_y', '_z', '_t', '_T'], [math.sin])
+    nodes = [graph.nodes[index] for index in graph.ordered_nodes()]
+    assert ('const', 6) in nodes
+    assert ('const', math.pi) in nodes
+    assert sum(node[0] == 'call' for node in nodes) == 1
+    assert not any(node[0] == 'binop' and node[1] == '**' for node in nodes)
+
+    function = nx.compile_group(['math.sin(_x)*(2*3) + _y**2', 'math.sin(_x) + math.pi'], {'math': math}, ['_x', '_y', '_z', '_t', '_T'], [math.sin])
+    assert function(0.5, 3.0, 0, 0, 0) == (math.sin(0.5) * 6 + 9.0, math.sin(0.5) + math.pi)
+
+def test_adaptive_frames_stay_within_tolerance():
+    tolerance = 1e-3
+    basis = np.linspace(-1, 1, 30).reshape(10, 3)
+
+    def evaluate(position):
+        return basis * (1 + 0.5 * math.sin(position / 8))
+
+    positions = [float(position) for position in range(0, 97, 4)]
+    kept = list(ne.adaptive_frames(evaluate, positions, tolerance, 1.0))
+    kept_positions = [position for position, coordinates in kept]
+    assert kept_positions[0] == positions[0] and kept_positions[-1] == positions[-1]
+    assert kept_positions == sorted(kept_positions)
+
+    # Playing the kept keys back linearly reproduces every frame
+    for position in np.arange(0.0, 97.0, 1.0):
+        right = next(index for index, kept_position in enumerate(kept_positions) if kept_position >= position)
+        if kept_positions[right] == position:
+            played = kept[right][1]
+        else:
+            (left_position, left), (right_position, right_coordinates) = kept[right - 1], kept[right]
+            played = left + (right_coordinates - left) * (position - left_position) / (right_position - left_position)
+        assert np.abs(played - evaluate(position)).max() <= tolerance * 2
+
+def test_adaptive_frames_drop_linear_motion():
+    basis = np.ones((4, 3))
+    kept = list(ne.adaptive_frames(lambda position: basis * position, [float(position) for position in range(0, 49, 2)], 1e-6, 1.0))
+    # Only the window of held samples, 16 by default, forces a key in between
+    assert [position for position, coordinates in kept] == [0.0, 32.0, 48.0]
+
+def test_per_vertex_fallback_is_in_the_run_report():
+    npf = support.load('NodeProfile')
+    ne.note_per_vertex = npf.add_per_vertex
+    try:
+        profile = npf.RunProfile()
+        context = ne.EvaluationContext()
+        x = np.array([-1.0, 2.0])
+        equations = ('[x] * 2', '1 if [x] > 0 else 0')
+        for run in range(2):
+            doubled, positive = context.evaluate_arrays(equations, x, x, x, 0.0, 1.0)
+        assert list(doubled) == [-2.0, 4.0]
+        assert list(positive) == [0.0, 1.0]
+        report = profile.report()
+        assert report['per_vertex'] == ['1 if [x] > 0 else 0']
+        assert npf.summary_lines(npf.json.dumps(report))[-2:] == ['Not vectorizable, evaluated per vertex (1):', '1 if [x] > 0 else 0']
+    finally:
+        ne.note_per_vertex = None
+
+def test_memory_is_reported_as_growth_of_the_process_peak():
+    npf = support.load('NodeProfile')
+    profile = npf.RunProfile()
+    with profile.measure('Grid', 'GRD'):
+        pass
+    report = profile.report()
+    [entry] = report['nodes']
+    if report['process_peak_rss'] is None:
+        assert entry['peak_rss_growth'] is None # No resource module on Windows
+    else:
+        assert 0 <= entry['peak_rss_growth'] <= report['peak_rss_growth'] < report['process_peak_rss']
+        assert any(line.startswith('Process peak memory: ') for line in npf.summary_lines(npf.json.dumps(report)))
@@ -0,0 +1,76 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+
+import types
+import support
+
+stand_in = support.install_stand_in()
+nd = support.load('NodeDirty')
+
+import bpy
+
+class NodeTree:
+
+    def __init__(self, *nodes):
+        self.nodes = {node.name: node for node in nodes}
+
+def grid_node():
+    return types.SimpleNamespace(name='Grid', automation_type='GRD', cache_record='')
+
+def run_node(node, signature, object_name, use_cache):
+    # One run in which node executes and makes one object
+    run_state = nd.new_run_state(use_cache)
+    names_before = nd.object_names()
+    bpy.data.objects.new(object_name, bpy.data.meshes.new(object_name))
+    nd.record_outputs(node, signature, names_before, run_state)
+    nd.save_records(NodeTree(node), run_state)
+
+def test_runs_without_cache_keep_earlier_results():
+    stand_in.reset()
+    node = grid_node()
+    run_node(node, 'first', 'Grid A', True)
+    run_node(node, 'second', 'Grid B', False)
+    run_node(node, 'third', 'Grid C', False)
+    assert sorted(bpy.data.objects.keys()) == ['Grid A', 'Grid B', 'Grid C']
+    assert list(nd.get_records(node)) == ['first']
+
+def test_rerun_replaces_outputs_with_the_same_signature():
+    stand_in.reset()
+    node = grid_node()
+    run_node(node, 'same', 'Grid A', True)
+    run_node(node, 'same', 'Grid B', True)
+    assert bpy.data.objects.keys() == ['Grid B']
+    assert nd.get_records(node) == {'same': {'objects': ['Grid B'], 'frame_end': bpy.context.scene.frame_end}}
+
+def test_rerun_replaces_outputs_with_another_signature():
+    stand_in.reset()
+    node = grid_node()
+    run_node(node, 'first', 'Grid A', True)
+    run_node(node, 'second', 'Grid B', True)
+    assert bpy.data.objects.keys() == ['Grid B']
+    assert list(nd.get_records(node)) == ['second']
+
+def test_nodes_that_did_not_run_keep_their_outputs():
+    stand_in.reset()
+    grid = grid_node()
+    other = types.SimpleNamespace(name='Other Grid', automation_type='GRD', cache_record='')
+    run_node(grid, 'first', 'Grid A', True)
+    run_node(other, 'first', 'Grid B', True)
+    assert sorted(bpy.data.objects.keys()) == ['Grid A', 'Grid B']
+    assert list(nd.get_records(grid)) == ['first']
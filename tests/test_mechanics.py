@@ -0,0 +1,79 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+
+# Where a Transform continues from on an object an earlier node already changed
+
+import types
+import support
+
+stand_in = support.install_stand_in()
+nm = support.load('NodeMechanics')
+
+class ShapeKeys:
+
+    # Key datablock: its custom properties, key blocks and (unless keyframed) no animation
+    def __init__(self, *names):
+        self.name = 'Key'
+        self.animation_data = None
+        self.key_blocks = {name: types.SimpleNamespace(name=name) for name in names}
+        self.properties = {}
+
+    def get(self, name, default=None):
+        return self.properties.get(name, default)
+
+    def __setitem__(self, name, value):
+        self.properties[name] = value
+
+class MeshObject:
+
+    def __init__(self, *key_names):
+        self.data = types.SimpleNamespace(shape_keys=ShapeKeys(*key_names))
+        self.removed = []
+
+    def shape_key_remove(self, key_block):
+        self.removed.append(key_block.name)
+
+def begin(obj, monkeypatch):
+    monkeypatch.setattr(nm, 'duplicate_object', lambda obj: obj)
+    return nm.begin_object_transform(obj)
+
+def test_transform_after_cache_output_starts_from_basis(monkeypatch):
+    # A PC2 or NPY output leaves a Basis key and no keyframes
+    obj = MeshObject('Basis')
+    activeObj, startframe, basisKey = begin(obj, monkeypatch)
+    assert (startframe, basisKey) == (0.0, 'Basis')
+    assert obj.removed == []
+
+def test_transform_after_shape_keys_continues_from_the_last_key(monkeypatch):
+    obj = MeshObject('Basis', 'Key 0.0', 'Key 24.0')
+    nm.na.set_indexed_last_keyframe(obj.data.shape_keys, 24.0)
+    activeObj, startframe, basisKey = begin(obj, monkeypatch)
+    assert (startframe, basisKey) == (24.0, 'Key 24.0')
+    assert obj.removed == ['Key 24.0']
+
+def test_missing_last_key_falls_back_to_basis(monkeypatch):
+    obj = MeshObject('Basis', 'Key 0.0')
+    nm.na.set_indexed_last_keyframe(obj.data.shape_keys, 24.0)
+    activeObj, startframe, basisKey = begin(obj, monkeypatch)
+    assert (startframe, basisKey) == (24.0, 'Basis')
+    assert obj.removed == []
+
+def test_live_playback_shares_the_evaluation_module():
+    # One NodeEvaluation, so live frames reuse the imported files and are counted like the rest
+    assert nm.nl.ne is nm.ne
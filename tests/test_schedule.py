@@ -0,0 +1,63 @@
+# © 2025 Frank Dininno
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# This add-on is built upon Blender's open-source codebase. Special thanks to
+# the [Blender Foundation](https://www.blender.org/).
+
+
+# Results calculated ahead on worker threads: each is picked up as soon as it is ready, and they share one budget
+
+import threading
+import support
+
+nsc = support.load('NodeSchedule')
+
+def test_get_waits_only_for_its_node():
+    later_may_finish = threading.Event()
+
+    def first(results, reserve):
+        return 'first'
+
+    def later(results, reserve):
+        later_may_finish.wait(5)
+        return results['first'] + ' then later'
+
+    prefetch = nsc.Prefetch([[('first', first, ()), ('later', later, ())]], 1024)
+    try:
+        assert prefetch.get('first') == 'first' # Would block until the timeout if it waited for the branch
+        assert not later_may_finish.is_set()
+        later_may_finish.set()
+        assert prefetch.get('later') == 'first then later'
+        assert prefetch.get('later') is None
+    finally:
+        later_may_finish.set()
+        prefetch.cancel()
+
+def test_branches_share_the_memory_budget():
+    def take(size):
+        def step(results, reserve):
+            return reserve(size)
+        return step
+
+    prefetch = nsc.Prefetch([[('a', take(600), ())], [('b', take(600), ())]], 1000)
+    assert sorted([prefetch.get('a'), prefetch.get('b')]) == [False, True]
+    assert prefetch.budget.used == 0 # Released as each result was picked up
+
+def test_failing_step_gives_none():
+    def fail(results, reserve):
+        raise ValueError('no grid')
+
+    prefetch = nsc.Prefetch([[('grid', fail, ())]], 1024)
+    assert prefetch.get('grid') is None